@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
+# Async views run their queries on a fresh thread per request, so a
+# persistent connection would never be reused; let each request close its own.
+os.environ.setdefault('DJANGO_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
+
+# Serve collectstatic's fingerprinted, precompressed files before Django.
+from studentorg.staticserver import AsgiStaticFiles  # noqa: E402
+
+application = AsgiStaticFiles(application)
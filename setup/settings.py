@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'studentorg.middleware.QueryInstrumentationMiddleware',
+    'studentorg.middleware.ReadReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,6 +63,8 @@ TEMPLATES = [
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         "DIRS": [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
+        # With no 'loaders' given, Django wraps these loaders in the cached
+        # loader, so each template is compiled once per process.
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -83,6 +89,167 @@ DATABASES = {
     }
 }
 
+# DJANGO_DB_ENGINE=postgresql switches to PostgreSQL (needs psycopg). The
+# connection comes from the usual libpq variables: PGDATABASE, PGUSER,
+# PGPASSWORD, PGHOST and PGPORT.
+
+if os.environ.get('DJANGO_DB_ENGINE') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('PGDATABASE', 'psusphere'),
+        }
+    }
+
+# Connection profile
+#
+# 'tuned' keeps connections open for DJANGO_CONN_MAX_AGE seconds, checking
+# they still work before reuse, rather than reconnecting on every request.
+# On SQLite it also puts the file in WAL mode so readers and the writer stop
+# blocking each other, waits busy_timeout ms for locks, and takes the write
+# lock when a transaction begins (transaction_mode IMMEDIATE) so concurrent
+# enrollments queue up instead of failing with "database is locked" when
+# both try to upgrade a read lock. DJANGO_DB_PROFILE=stock restores Django's
+# defaults; "manage.py benchmark_concurrency" compares the two.
+
+DATABASE_PROFILES = {
+    'stock': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    'tuned': {'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 60)),
+              'CONN_HEALTH_CHECKS': True},
+}
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -32000,  # KiB
+}
+
+SQLITE_OPTIONS = {
+    'stock': {},
+    'tuned': {
+        'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+
+DATABASE_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'tuned')
+DATABASES['default'].update(DATABASE_PROFILES[DATABASE_PROFILE])
+if DATABASES['default']['ENGINE'].endswith('sqlite3'):
+    DATABASES['default']['OPTIONS'] = SQLITE_OPTIONS[DATABASE_PROFILE]
+
+# Read replica (studentorg.routers.ReadReplicaRouter)
+#
+# With DJANGO_READ_REPLICA set (a file for SQLite, a host for PostgreSQL),
+# the chart endpoints and list views read from the 'replica' alias; forms,
+# imports and everything else use 'default'. After a POST the user's reads
+# stay on the primary for READ_REPLICA_STICKY_SECONDS so they see their own
+# writes. On SQLite the replica is a second file kept up to date by a single
+# `manage.py replicate --interval 1` process (studentorg.replication). For
+# READ_REPLICA_MAX_LAG seconds after a model is written, views that cache
+# data derived from it read the primary, so a lagging replica cannot be
+# cached under the new generation; set it above the replica's worst lag.
+
+READ_REPLICA_ALIAS = 'replica'
+READ_REPLICA_STICKY_SECONDS = 5
+READ_REPLICA_MAX_LAG = 5
+
+if os.environ.get('DJANGO_READ_REPLICA') and DATABASES['default']['ENGINE'].endswith('postgresql'):
+    # On PostgreSQL the variable names the replica's host.
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DJANGO_READ_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+elif os.environ.get('DJANGO_READ_REPLICA'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DJANGO_READ_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['studentorg.routers.ReadReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+#
+# Chart payloads are versioned by per-model write counters stored here, so
+# every worker process must share one cache. Local memory is enough for
+# runserver; point DJANGO_CACHE_DIR at a directory to use the file-based
+# cache when running several workers.
+
+if os.environ.get('DJANGO_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['DJANGO_CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'psusphere',
+        }
+    }
+
+
+# Whether every process sees the same cache. Cache-backed sessions, the
+# user cache and out-of-process jobs depend on it.
+SHARED_CACHE = CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache'
+
+
+# Sessions and authentication
+#
+# DJANGO_SESSION_PROFILE picks where sessions live: "db" (Django's default,
+# a SELECT per request), "cached_db" (read from the cache, written through
+# to the database) or "signed_cookies" (no server-side storage at all; the
+# session is limited to what fits in a cookie). Sessions are only written
+# when they change. CachedModelBackend keeps the logged-in user in the
+# cache as well, so with cached_db or signed_cookies an authenticated page
+# view normally runs no session or auth_user queries.
+# "manage.py benchmark_sessions" compares the profiles.
+#
+# Both need a cache every worker shares: with the per-process local memory
+# cache a logout, password change or deactivation would only reach the
+# process that handled it. Without DJANGO_CACHE_DIR the default is
+# therefore "db" with the stock backend, and cached_db is refused. Users
+# changed with QuerySet.update() send no signal and stay cached for up to
+# AUTH_USER_CACHE_SECONDS.
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_PROFILE = os.environ.get('DJANGO_SESSION_PROFILE', 'cached_db' if SHARED_CACHE else 'db')
+if SESSION_PROFILE == 'cached_db' and not SHARED_CACHE:
+    raise ImproperlyConfigured('DJANGO_SESSION_PROFILE=cached_db needs DJANGO_CACHE_DIR.')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+SESSION_SAVE_EVERY_REQUEST = False
+
+AUTHENTICATION_BACKENDS = [
+    'studentorg.auth.CachedModelBackend' if SHARED_CACHE
+    else 'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_SECONDS = 60
+
+
+# Background jobs (studentorg.jobs), run by `manage.py run_worker`.
+# Failed jobs are retried after JOB_RETRY_DELAY seconds, doubling each
+# attempt; running jobs without a progress update for JOB_STALE_SECONDS are
+# requeued when a worker starts. DJANGO_JOBS_INLINE=1 runs every job inside
+# the request that queued it, for development without a worker. Jobs
+# invalidate cached pages and charts through the cache, so they also run
+# inline, and run_worker refuses to start, unless the cache is shared.
+
+JOB_WORKER_PROCESSES = int(os.environ.get('DJANGO_JOB_WORKERS', 2))
+JOB_RETRY_DELAY = 30
+JOB_STALE_SECONDS = 3600
+JOB_QUEUE_INLINE = os.environ.get('DJANGO_JOBS_INLINE') == '1' or not SHARED_CACHE
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -124,11 +291,56 @@ STATICFILES_DIRS = (
     BASE_DIR / 'static',
 )
 
+# With DEBUG off, collectstatic runs the build stage in studentorg.storage:
+# the bundles in studentorg.assets are concatenated, every file gets a
+# content hash in its name, and gzip (plus brotli, if installed) copies are
+# written alongside. setup/wsgi.py serves the result through
+# studentorg.staticserver with far-future Cache-Control headers. Run
+# "manage.py vendor_assets" once to replace the CDN copies of Chart.js and
+# the Nunito font with local ones.
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': ('django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+                    else 'studentorg.storage.BundledManifestStorage'),
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Request instrumentation (studentorg.middleware.QueryInstrumentationMiddleware).
+# Every request gets a Server-Timing header and a JSON line on the
+# studentorg.requests logger; requests slower than REQUEST_PROFILE_SLOW_MS
+# are logged at WARNING. The most recent REQUEST_PROFILE_BUFFER_SIZE profiles
+# are kept in memory and served to staff at /profile/requests/ (0 disables).
+
+REQUEST_PROFILE_SLOW_MS = 500
+REQUEST_PROFILE_SLOWEST = 3
+REQUEST_PROFILE_BUFFER_SIZE = 200
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'studentorg.requests': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 LOGIN_URL = 'login'
@@ -24,7 +24,8 @@ from studentorg.views import (
     CollegeList, CollegeCreateView, CollegeUpdateView, CollegeDeleteView,
     ProgramList, ProgramCreateView, ProgramUpdateView, ProgramDeleteView,
     RadarChartOrgParticipation, BubbleChartStudentPrograms, HorizontalBarTopOrganizations,
-    StackedBarOrgMemberTrends, DoughnutProgramDistribution
+    StackedBarOrgMemberTrends, DoughnutProgramDistribution, DashboardStats,
+    RequestProfiles, Export, Import, Autocomplete, JobStatus, JobDetail
 )
 from studentorg import views
 from django.contrib.auth import views as auth_views
@@ -32,6 +33,13 @@ from django.contrib.auth import views as auth_views
 urlpatterns = [
     path("admin/", admin.site.urls),
     path('', views.HomePageView.as_view(), name='home'),
+    path('dashboard/stats/', DashboardStats, name='dashboard-stats'),
+    path('profile/requests/', RequestProfiles, name='request-profiles'),
+    path('export/<str:entity>/', Export, name='export'),
+    path('import/', Import, name='import'),
+    path('autocomplete/<str:source>/', Autocomplete, name='autocomplete'),
+    path('jobs/<int:pk>/', JobDetail, name='job-detail'),
+    path('jobs/<int:pk>/status/', JobStatus, name='job-status'),
     path('radarChartOrgParticipation/',
          RadarChartOrgParticipation, name='radar-chart'),
     path('bubbleChartStudentPrograms/',
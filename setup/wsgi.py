@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
 
 application = get_wsgi_application()
+
+# Serve collectstatic's fingerprinted, precompressed files before Django.
+from studentorg.staticserver import StaticFiles  # noqa: E402
+
+application = StaticFiles(application)
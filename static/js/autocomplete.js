@@ -0,0 +1,116 @@
+// Typeahead for selects rendered by studentorg.widgets.AutocompleteSelect.
+// The select stays in the form (hidden) and holds the chosen option; a text
+// box in front of it queries data-autocomplete-url and lists one page of
+// matches at a time.
+(function () {
+  function debounce(fn, wait) {
+    let timer;
+    return function () {
+      const args = arguments;
+      clearTimeout(timer);
+      timer = setTimeout(function () { fn.apply(null, args); }, wait);
+    };
+  }
+
+  function attach(select) {
+    const wrapper = document.createElement('div');
+    wrapper.className = 'dropdown';
+    const input = document.createElement('input');
+    input.type = 'text';
+    input.className = select.className;
+    input.autocomplete = 'off';
+    input.placeholder = 'Type to search ...';
+    const current = select.options[select.selectedIndex];
+    input.value = current && current.value ? current.text : '';
+    const menu = document.createElement('div');
+    menu.className = 'dropdown-menu';
+    menu.style.maxHeight = '300px';
+    menu.style.overflowY = 'auto';
+    menu.style.width = '100%';
+
+    select.parentNode.insertBefore(wrapper, select);
+    wrapper.appendChild(input);
+    wrapper.appendChild(menu);
+    wrapper.appendChild(select);
+    select.style.display = 'none';
+
+    let query = '';
+    let request = 0;
+
+    function choose(id, text) {
+      let option = Array.prototype.find.call(select.options, function (o) { return o.value === String(id); });
+      if (!option) {
+        option = new Option(text, id);
+        select.add(option);
+      }
+      option.selected = true;
+      input.value = text;
+      menu.classList.remove('show');
+      select.dispatchEvent(new Event('change', { bubbles: true }));
+    }
+
+    function load(page) {
+      const token = ++request;
+      const url = new URL(select.dataset.autocompleteUrl, window.location.origin);
+      url.searchParams.set('q', query);
+      url.searchParams.set('page', page);
+      fetch(url, { credentials: 'same-origin' })
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          if (token !== request) {
+            return;
+          }
+          if (page === 1) {
+            menu.innerHTML = '';
+          }
+          const more = menu.querySelector('.autocomplete-more');
+          if (more) {
+            more.remove();
+          }
+          data.results.forEach(function (result) {
+            const item = document.createElement('a');
+            item.href = '#';
+            item.className = 'dropdown-item';
+            item.textContent = result.text;
+            item.addEventListener('mousedown', function (event) {
+              event.preventDefault();
+              choose(result.id, result.text);
+            });
+            menu.appendChild(item);
+          });
+          if (data.more) {
+            const item = document.createElement('a');
+            item.href = '#';
+            item.className = 'dropdown-item autocomplete-more text-muted';
+            item.textContent = 'More ...';
+            item.addEventListener('mousedown', function (event) {
+              event.preventDefault();
+              load(page + 1);
+            });
+            menu.appendChild(item);
+          }
+          if (!menu.children.length) {
+            menu.innerHTML = '<span class="dropdown-item disabled">No matches</span>';
+          }
+          menu.classList.add('show');
+        });
+    }
+
+    const search = debounce(function () {
+      query = input.value.trim();
+      load(1);
+    }, 200);
+
+    input.addEventListener('input', search);
+    input.addEventListener('focus', function () { query = ''; load(1); });
+    input.addEventListener('blur', function () {
+      menu.classList.remove('show');
+      const selected = select.options[select.selectedIndex];
+      input.value = selected && selected.value ? selected.text : '';
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(attach);
+  });
+})();
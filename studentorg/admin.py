@@ -1,31 +1,36 @@
 from django.contrib import admin
-from .models import College, Program, Organization, Student, OrgMember
+from .models import College, Program, Organization, Student, OrgMember, Job
 
 admin.site.register(College)
 
 @admin.register(Program)
 class ProgramAdmin(admin.ModelAdmin):
-    list_display = ("prog_name", "college")
+    list_display = ("prog_name", "college", "student_count", "member_count")
+    list_select_related = ("college",)
     search_fields = ("prog_name", "college__college_name") 
 
 @admin.register(Organization)
 class OrganizationAdmin(admin.ModelAdmin):
-    list_display = ("name", "college", "description")
+    list_display = ("name", "college", "description", "member_count")
+    list_select_related = ("college",)
     search_fields = ("name", "college__college_name")
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ("student_id", "lastname", "firstname", "middlename", "program", "college")
+    list_select_related = ("program", "college")
     search_fields = ("lastname", "firstname", "college__college_name")
 
 @admin.register(OrgMember)
 class OrgMemberAdmin(admin.ModelAdmin):
     list_display = ("student", "get_member_program", "organization", "date_joined")
+    list_select_related = ("student__program", "organization")
     search_fields = ("student__lastname", "student__firstname",)
 
     def get_member_program(self, obj):
-        try:
-            member = Student.objects.get(id=obj.student_id)
-            return member.program
-        except Student.DoesNotExist:
-            return None
+        return obj.student.program
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "attempts", "progress", "total", "created_at", "finished_at")
+    list_filter = ("status", "kind")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StudentorgConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'studentorg'
+
+    def ready(self):
+        from studentorg import checks, signals  # noqa: F401
@@ -0,0 +1,71 @@
+import re
+import urllib.request
+
+
+# Per-page bundles. collectstatic (studentorg.storage) concatenates the
+# sources of each bundle into one file before hashing it, so a page loads
+# one stylesheet and one script; during development the {% bundle %} tag
+# links the sources one by one instead. CSS bundles live in css/ like their
+# sources so relative url()s keep resolving.
+BUNDLES = {
+    'css/base.bundle.css': [
+        'css/bootstrap.min.css',
+        'css/ready.min.css',
+        'css/demo.css',
+    ],
+    'js/base.bundle.js': [
+        'js/core/jquery.3.2.1.min.js',
+        'js/core/popper.min.js',
+        'js/core/bootstrap.min.js',
+        'js/plugin/jquery-scrollbar/jquery.scrollbar.min.js',
+        'js/ready.min.js',
+    ],
+}
+
+# Third-party assets the pages used to pull from CDNs. "manage.py
+# vendor_assets" downloads them into static/vendor/; until then the
+# {% vendored %} tag keeps linking the CDN copy.
+VENDORED = {
+    'vendor/chart.umd.js': 'https://cdn.jsdelivr.net/npm/chart.js@4.4.4/dist/chart.umd.js',
+    'vendor/nunito/nunito.css': (
+        'https://fonts.googleapis.com/css?family=Nunito:200,200i,300,300i,400,400i,'
+        '600,600i,700,700i,800,800i,900,900i'),
+}
+
+# Google Fonts picks the font format from the User-Agent; ask for woff2.
+_USER_AGENT = ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+               '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+_FONT_URL = re.compile(r'url\((https://[^)]+)\)')
+
+
+def fetch(url):
+    request = urllib.request.Request(url, headers={'User-Agent': _USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def vendor(name, url, root):
+    """Download ``url`` to ``root/name``; returns the files written.
+
+    Stylesheets have the fonts they reference downloaded next to them and
+    their url()s rewritten to the local copies.
+    """
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = fetch(url)
+    written = [path]
+    if name.endswith('.css'):
+        css = content.decode()
+        for index, font_url in enumerate(dict.fromkeys(_FONT_URL.findall(css))):
+            font = path.parent / f'{path.stem}-{index}{_extension(font_url)}'
+            font.write_bytes(fetch(font_url))
+            written.append(font)
+            css = css.replace(font_url, font.name)
+        content = css.encode()
+    path.write_bytes(content)
+    return written
+
+
+def _extension(url):
+    match = re.search(r'\.(woff2|woff|ttf|otf|eot|svg)(?:$|\?)', url)
+    return f'.{match.group(1)}' if match else '.woff2'
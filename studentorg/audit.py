@@ -0,0 +1,149 @@
+import re
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import RequestFactory
+
+from studentorg import autocomplete, charts, views
+
+
+# Whole-table reads that are expected: the semester summary table is small
+# by design and the trend chart reads every row of it.
+EXPECTED_SCANS = {'studentorg_semesterstats'}
+
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)$')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+# Subqueries SQLite evaluates into a temporary result, e.g. the capped
+# COUNT(*) of studentorg.pagination.CachedCountPaginator; scanning those
+# reads no table.
+_SQLITE_SUBQUERY = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\w+)$')
+
+
+class StatementCollector:
+    """``execute_wrapper`` hook keeping each statement with its params."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many:
+            self.statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def chart_targets():
+    return [
+        ('chart:org_participation', charts.org_participation),
+        ('chart:program_distribution', charts.program_distribution),
+        ('chart:student_programs', charts.student_programs),
+        ('chart:top_organizations', charts.top_organizations),
+        ('chart:member_trends', charts.member_trends),
+        ('chart:member_trends(month)', lambda: charts.member_trends(granularity='month')),
+    ]
+
+
+def list_targets(query='a'):
+    lists = [
+        ('organization', views.OrganizationList),
+        ('orgmember', views.OrgMemberList),
+        ('student', views.StudentList),
+        ('college', views.CollegeList),
+        ('program', views.ProgramList),
+    ]
+    factory = RequestFactory()
+    # An unsaved user passes login_required without touching the database.
+    user = User(username='audit')
+
+    def render(view, params):
+        def target():
+            request = factory.get('/', params)
+            request.user = user
+            request.session = {}
+            handler = view.as_view()
+            if iscoroutinefunction(handler):
+                # Async ORM calls hop back to this thread, so the
+                # statements still go through its connection.
+                response = async_to_sync(handler)(request)
+            else:
+                response = handler(request)
+            response.render()
+        return target
+
+    targets = []
+    for name, view in lists:
+        targets += [
+            (f'list:{name}', render(view, {})),
+            (f'list:{name}?page=last', render(view, {'page': 'last'})),
+            (f'list:{name}?q', render(view, {'q': query})),
+        ]
+    targets += [
+        ('list:organization?sort=members', render(views.OrganizationList, {'sort': 'members'})),
+        ('list:program?sort=students', render(views.ProgramList, {'sort': 'students'})),
+    ]
+    return targets
+
+
+def autocomplete_targets(query='a'):
+    targets = []
+    for source in autocomplete.SOURCES:
+        targets += [
+            (f'autocomplete:{source}', lambda source=source: autocomplete.options(source)),
+            (f'autocomplete:{source}?q', lambda source=source: autocomplete.options(source, query)),
+        ]
+    return targets
+
+
+def capture(target, using='default'):
+    collector = StatementCollector()
+    with connections[using].execute_wrapper(collector):
+        target()
+    return collector.statements
+
+
+def explain(sql, params, using='default'):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return [row[0] for row in cursor.fetchall()]
+    raise NotImplementedError(f'Index audit does not support {connection.vendor}.')
+
+
+def full_scans(plan, vendor):
+    pattern = _SQLITE_SCAN if vendor == 'sqlite' else _POSTGRES_SCAN
+    subqueries = {match.group(1) for match in map(_SQLITE_SUBQUERY.search, map(str.strip, plan))
+                  if match}
+    scans = []
+    for line in plan:
+        match = pattern.search(line.strip())
+        # sqlite_master reads come from Django's own introspection.
+        if match and match.group(1) not in EXPECTED_SCANS | subqueries \
+                and not match.group(1).startswith('sqlite_'):
+            scans.append(match.group(1))
+    return scans
+
+
+def audit(targets, using='default'):
+    """Explain every statement ``targets`` run and flag full table scans.
+
+    Returns one entry per statement with its plan and the tables it reads
+    without an index. Only SELECTs are explained.
+    """
+    vendor = connections[using].vendor
+    results = []
+    for name, target in targets:
+        for sql, params in capture(target, using):
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = explain(sql, params, using)
+            results.append({
+                'target': name,
+                'sql': sql,
+                'plan': plan,
+                'full_scans': full_scans(plan, vendor),
+            })
+    return results
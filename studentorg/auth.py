@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from studentorg.cache import KEY_PREFIX
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}:user:{user_id}'
+
+
+def forget(user_id):
+    cache.delete(_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that keeps session users in the cache.
+
+    AuthenticationMiddleware already loads the user once per request; this
+    saves the auth_user SELECT on every request after the first, for
+    AUTH_USER_CACHE_SECONDS. Saving or deleting a user drops its entry (see
+    studentorg/signals.py), so password changes and deactivations apply
+    at once. With a per-process local memory cache that invalidation would
+    not reach the other workers, so the cache is not used at all.
+    """
+
+    def get_user(self, user_id):
+        if isinstance(caches['default'], LocMemCache):
+            return super().get_user(user_id)
+        key = _key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_SECONDS)
+        return user
@@ -0,0 +1,27 @@
+from studentorg.models import College, Program, Organization, Student
+from studentorg.search import search
+
+
+PAGE_SIZE = 20
+
+# Options for the foreign-key selects, listed in index order until the user
+# types, then by full-text prefix match (studentorg.search), best first.
+SOURCES = {
+    'student': (Student, ['lastname', 'firstname', 'id']),
+    'organization': (Organization, ['name', 'id']),
+    'program': (Program, ['prog_name', 'id']),
+    'college': (College, ['college_name', 'id']),
+}
+
+
+def options(source, query='', page=1):
+    """One page of ``(pk, label)`` options and whether another page follows."""
+    model, ordering = SOURCES[source]
+    qs = model.objects.order_by(*ordering)
+    if query:
+        qs = search(qs, query)
+
+    start = (page - 1) * PAGE_SIZE
+    # One extra row tells us whether there is a next page without a COUNT.
+    rows = list(qs[start:start + PAGE_SIZE + 1])
+    return [(obj.pk, str(obj)) for obj in rows[:PAGE_SIZE]], len(rows) > PAGE_SIZE
@@ -0,0 +1,248 @@
+import io
+import json
+import statistics
+import time
+from datetime import date
+from itertools import count
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+from studentorg.models import College, Program, Organization, Student, OrgMember
+from studentorg.pagination import encode_cursor
+
+
+_unique = count()
+
+
+class Scenario:
+    """One benchmarked request.
+
+    ``setup`` runs untimed before each request and its result is passed to
+    ``path`` and ``data`` when they are callables, e.g. to create the row a
+    delete request removes.
+    """
+
+    def __init__(self, name, url_name, path, method='get', data=None, setup=None, status=200):
+        self.name = name
+        self.url_name = url_name
+        self.path = path
+        self.method = method
+        self.data = data
+        self.setup = setup
+        self.status = status
+
+    def request(self, client):
+        context = self.setup() if self.setup else None
+        path = self.path(context) if callable(self.path) else self.path
+        data = self.data(context) if callable(self.data) else self.data
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, self.method)(path, data or {})
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = time.perf_counter() - started
+
+        if response.status_code != self.status:
+            raise AssertionError(
+                f'{self.name}: {self.method.upper()} {path} returned {response.status_code}')
+        return elapsed * 1000, len(queries), size
+
+
+def seed(colleges, programs, orgs, students, members, seed=None):
+    College.objects.bulk_create(
+        College(college_name=f'College {i}') for i in range(colleges))
+    college_ids = list(College.objects.values_list('id', flat=True))
+    Program.objects.bulk_create(
+        Program(prog_name=f'Program {i}', college_id=college_ids[i % len(college_ids)])
+        for i in range(programs))
+    call_command('create_initial_data', orgs=orgs, students=students, members=members,
+                 seed=seed, stdout=io.StringIO())
+
+
+def _cursor_at(model, depth, per_page=5):
+    obj = model.objects.order_by('-created_at', '-id')[depth * per_page:][:1].first()
+    return encode_cursor(obj, 'next') if obj else ''
+
+
+def _last_page(model, per_page=5):
+    return max(1, -(-model.objects.count() // per_page))
+
+
+def build_scenarios(deep_page=200):
+    college = College.objects.first()
+    program = Program.objects.first()
+    organization = Organization.objects.first()
+    student = Student.objects.first()
+    member = OrgMember.objects.first()
+    term = student.lastname[:3]
+
+    def new_college():
+        return College.objects.create(college_name=f'Bench College {next(_unique)}')
+
+    def new_program():
+        return Program.objects.create(prog_name=f'Bench Program {next(_unique)}', college=college)
+
+    def new_organization():
+        return Organization.objects.create(
+            name=f'Bench Org {next(_unique)}', college=college, description='Benchmark')
+
+    def new_student():
+        n = next(_unique)
+        return Student.objects.create(
+            student_id=f'B-{n}', lastname=f'Bench{n}', firstname='Bench',
+            program=program, college=college)
+
+    def new_member():
+        return OrgMember.objects.create(
+            student=new_student(), organization=organization, date_joined=date.today())
+
+    def student_data(context=None):
+        n = next(_unique)
+        return {'student_id': f'P-{n}', 'lastname': f'Post{n}', 'firstname': 'Post',
+                'middlename': '', 'program': program.pk, 'college': college.pk}
+
+    def member_data(context=None):
+        return {'student': new_student().pk, 'organization': organization.pk,
+                'date_joined': date.today().isoformat()}
+
+    scenarios = [
+        Scenario('home', 'home', reverse('home')),
+        Scenario('login', 'login', reverse('login')),
+        Scenario('dashboard-stats', 'dashboard-stats', reverse('dashboard-stats')),
+        Scenario('radar-chart', 'radar-chart', reverse('radar-chart')),
+        Scenario('bubble-chart', 'bubble-chart', reverse('bubble-chart')),
+        Scenario('horizontal-bar-chart', 'horizontal-bar-chart', reverse('horizontal-bar-chart')),
+        Scenario('stacked-bar-chart', 'stacked-bar-chart', reverse('stacked-bar-chart')),
+        Scenario('doughnut-chart', 'doughnut-chart', reverse('doughnut-chart')),
+    ]
+
+    lists = [
+        ('organization', Organization, organization.name.split()[0]),
+        ('orgmember', OrgMember, term),
+        ('student', Student, term),
+        ('college', College, 'College'),
+        ('program', Program, 'Program'),
+    ]
+    for prefix, model, query in lists:
+        url = reverse(f'{prefix}-list')
+        scenarios += [
+            Scenario(f'{prefix}-list', f'{prefix}-list', url),
+            Scenario(f'{prefix}-list-search', f'{prefix}-list', f'{url}?q={query}'),
+            Scenario(f'{prefix}-list-deep', f'{prefix}-list',
+                     f'{url}?page={min(deep_page, _last_page(model))}'),
+        ]
+        if model in (OrgMember, Student):
+            # The lists ordered like the cursor, which honour ?cursor=.
+            scenarios.append(Scenario(f'{prefix}-list-deep-cursor', f'{prefix}-list',
+                                      f'{url}?cursor={_cursor_at(model, deep_page)}'))
+
+    for source, query in [('student', term), ('organization', organization.name[:2]),
+                          ('program', 'Prog'), ('college', 'Coll')]:
+        url = reverse('autocomplete', args=[source])
+        scenarios += [
+            Scenario(f'autocomplete-{source}', 'autocomplete', url),
+            Scenario(f'autocomplete-{source}-search', 'autocomplete', f'{url}?q={query}'),
+        ]
+
+    forms = [
+        ('college', college, new_college, lambda c=None: {'college_name': f'Posted {next(_unique)}'}),
+        ('program', program, new_program,
+         lambda c=None: {'prog_name': f'Posted {next(_unique)}', 'college': college.pk}),
+        ('organization', organization, new_organization,
+         lambda c=None: {'name': f'Posted {next(_unique)}', 'college': college.pk,
+                         'description': 'Benchmark'}),
+        ('student', student, new_student, student_data),
+        ('orgmember', member, new_member, member_data),
+    ]
+    for prefix, instance, factory, data in forms:
+        scenarios += [
+            Scenario(f'{prefix}-add-form', f'{prefix}-add', reverse(f'{prefix}-add')),
+            Scenario(f'{prefix}-add', f'{prefix}-add', reverse(f'{prefix}-add'),
+                     method='post', data=data, status=302),
+            Scenario(f'{prefix}-update', f'{prefix}-update',
+                     reverse(f'{prefix}-update', args=[instance.pk]),
+                     method='post', data=data, status=302),
+            Scenario(f'{prefix}-delete', f'{prefix}-delete',
+                     lambda obj, prefix=prefix: reverse(f'{prefix}-delete', args=[obj.pk]),
+                     method='post', setup=factory, status=302),
+        ]
+
+    return scenarios
+
+
+def uncovered_urls(scenarios):
+    """Named project URLs that no scenario exercises."""
+    covered = {scenario.url_name for scenario in scenarios}
+    names = {pattern.name for pattern in get_resolver().url_patterns
+             if getattr(pattern, 'name', None)}
+    return sorted(names - covered - {'logout'})
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run(client, scenarios, iterations, warmup=1):
+    results = {}
+    for scenario in scenarios:
+        for _ in range(warmup):
+            scenario.request(client)
+        samples = [scenario.request(client) for _ in range(iterations)]
+        latencies = [sample[0] for sample in samples]
+        results[scenario.name] = {
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p90_ms': round(percentile(latencies, 90), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'max_ms': round(max(latencies), 3),
+            'queries': statistics.median_high(sample[1] for sample in samples),
+            'bytes': statistics.median_high(sample[2] for sample in samples),
+        }
+    return results
+
+
+def compare(report, baseline, tolerance=0.25, min_delta_ms=2.0):
+    """Compare ``report`` against ``baseline``; returns (regressions,
+    warnings).
+
+    Latency regresses when p50 grows by more than ``tolerance`` (and by at
+    least ``min_delta_ms``, to ignore timer noise on fast views); query
+    counts regress on any increase. A baseline from another database is
+    not comparable, which is a warning rather than a regression.
+    """
+    database = report.get('meta', {}).get('database', 'sqlite')
+    baseline_database = baseline.get('meta', {}).get('database', 'sqlite')
+    if database != baseline_database:
+        return [], [f'baseline was measured on {baseline_database}, not {database}; '
+                    f'skipping the comparison']
+
+    regressions = []
+    for name, current in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f"{name}: {previous['queries']} -> {current['queries']} queries")
+        limit = previous['p50_ms'] * (1 + tolerance)
+        if current['p50_ms'] > limit and current['p50_ms'] - previous['p50_ms'] >= min_delta_ms:
+            regressions.append(
+                f"{name}: p50 {previous['p50_ms']}ms -> {current['p50_ms']}ms")
+    return regressions, []
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
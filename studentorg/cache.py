@@ -0,0 +1,116 @@
+import hashlib
+import time
+from asyncio import iscoroutinefunction
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+
+# Cached data is keyed by per-model "generation" counters instead of a TTL.
+# Every write to a model bumps its generation, which changes the key of
+# anything derived from it, so stale entries are simply never read again
+# and age out of the cache on their own.
+
+KEY_PREFIX = 'studentorg'
+
+
+def _generation_key(model):
+    return f'{KEY_PREFIX}:generation:{model._meta.label_lower}'
+
+
+def _modified_key(model):
+    return f'{KEY_PREFIX}:modified:{model._meta.label_lower}'
+
+
+def generation(model):
+    key = _generation_key(model)
+    value = cache.get(key)
+    if value is None:
+        # Seed from the clock so a counter lost to eviction or a restart
+        # never comes back with a value that was already handed out.
+        cache.add(key, time.time_ns())
+        cache.add(_modified_key(model), time.time())
+        value = cache.get(key)
+    return value
+
+
+def last_modified(model):
+    generation(model)
+    return cache.get(_modified_key(model)) or time.time()
+
+
+def touch(*models):
+    """Invalidate everything derived from ``models``."""
+    now = time.time()
+    for model in models:
+        try:
+            cache.incr(_generation_key(model))
+        except ValueError:
+            cache.set(_generation_key(model), time.time_ns(), None)
+        cache.set(_modified_key(model), now, None)
+
+
+def version(*models):
+    return ':'.join(str(generation(model)) for model in models)
+
+
+def cached_json(*models, timeout=DEFAULT_TIMEOUT):
+    """Serve a JSON view from the cache until one of ``models`` is written.
+
+    The response carries an ETag and Last-Modified derived from the model
+    generations, and conditional requests are answered with 304. Async
+    views are wrapped by an async wrapper.
+    """
+    def decorator(view):
+        name = f'{view.__module__}.{view.__qualname__}'
+
+        def etag(request, *args, **kwargs):
+            digest = hashlib.md5(f'{name}:{request.GET.urlencode()}:{version(*models)}'.encode())
+            return digest.hexdigest()
+
+        def modified(request, *args, **kwargs):
+            stamp = max(last_modified(model) for model in models)
+            return datetime.fromtimestamp(stamp, tz=timezone.utc)
+
+        def respond(payload):
+            response = HttpResponse(payload, content_type='application/json')
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            @condition(etag_func=etag, last_modified_func=modified)
+            async def async_wrapper(request, *args, **kwargs):
+                key = f'{KEY_PREFIX}:json:{etag(request, *args, **kwargs)}'
+                payload = await cache.aget(key)
+                if payload is None:
+                    response = await view(request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                    payload = response.content
+                    await cache.aset(key, payload, timeout)
+                return respond(payload)
+
+            return async_wrapper
+
+        @wraps(view)
+        @condition(etag_func=etag, last_modified_func=modified)
+        def wrapper(request, *args, **kwargs):
+            key = f'{KEY_PREFIX}:json:{etag(request, *args, **kwargs)}'
+            payload = cache.get(key)
+            if payload is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                payload = response.content
+                cache.set(key, payload, timeout)
+            return respond(payload)
+
+        return wrapper
+
+    return decorator
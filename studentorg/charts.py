@@ -0,0 +1,209 @@
+from django.db.models import Count, Sum
+
+from studentorg.models import College, Program, Organization, Student, OrgMember, SemesterStats
+
+
+# Writes to any of these invalidate the cached chart payloads.
+SOURCES = (College, Program, Organization, Student, OrgMember)
+
+
+# Every dataset is read from the counter columns and summary table
+# maintained by studentorg/signals.py, so each query touches one row per
+# group rather than one row per member.
+
+
+# Each dataset is a queryset plus a function shaping its rows, so the sync
+# functions and their async ("a"-prefixed) twins share everything but the
+# fetch.
+
+
+async def _alist(qs):
+    return [row async for row in qs]
+
+
+def _college_rows():
+    return (College.objects
+            .values_list('college_name')
+            .annotate(org_count=Sum('organization_count'),
+                      program_count=Sum('program_count'))
+            .order_by('college_name'))
+
+
+def _org_participation(college_rows):
+    rows = sorted(college_rows, key=lambda row: row[1], reverse=True)[:7]
+    rows = [(name, org_count) for name, org_count, _ in rows]
+
+    while len(rows) < 7:
+        rows.append(('Placeholder', 0))
+
+    return {
+        'labels': [row[0] for row in rows],
+        'values': [row[1] for row in rows]
+    }
+
+
+def _program_distribution(college_rows):
+    rows = sorted(college_rows, key=lambda row: row[2], reverse=True)
+
+    return {
+        'labels': [row[0] for row in rows],
+        'program_counts': [row[2] for row in rows]
+    }
+
+
+def _student_program_rows():
+    # Programs sharing a name make one bubble, as they did when this was a
+    # GROUP BY prog_name over the base tables. student_count is the number
+    # of students; the old query counted a student once per membership,
+    # an artifact of joining the memberships in.
+    return (Program.objects
+            .values_list('prog_name')
+            .annotate(students=Sum('student_count'), members=Sum('member_count'))
+            .order_by('-students', 'prog_name')[:10])
+
+
+def _student_programs(rows):
+    return {
+        'labels': [row[0] for row in rows],
+        'student_counts': [row[1] for row in rows],
+        'org_memberships': [row[2] for row in rows]
+    }
+
+
+def _top_organization_rows():
+    # Organizations sharing a name are one bar, as with the old GROUP BY.
+    return (Organization.objects
+            .values_list('name')
+            .annotate(members=Sum('member_count'))
+            .order_by('-members', 'name')[:5])
+
+
+def _top_organizations(rows):
+    return {
+        'labels': [row[0] for row in rows],
+        'member_counts': [row[1] for row in rows]
+    }
+
+
+def org_participation():
+    return _org_participation(list(_college_rows()))
+
+
+async def aorg_participation():
+    return _org_participation(await _alist(_college_rows()))
+
+
+def program_distribution():
+    return _program_distribution(list(_college_rows()))
+
+
+async def aprogram_distribution():
+    return _program_distribution(await _alist(_college_rows()))
+
+
+def student_programs():
+    return _student_programs(list(_student_program_rows()))
+
+
+async def astudent_programs():
+    return _student_programs(await _alist(_student_program_rows()))
+
+
+def top_organizations():
+    return _top_organizations(list(_top_organization_rows()))
+
+
+async def atop_organizations():
+    return _top_organizations(await _alist(_top_organization_rows()))
+
+
+GRANULARITIES = {
+    'year': ('join_year',),
+    'term': ('join_year', 'join_term'),
+    'month': ('join_year', 'join_month'),
+}
+
+
+def _period_label(row, granularity):
+    if granularity == 'year':
+        return str(row['join_year'])
+    if granularity == 'month':
+        return f"{row['join_year']}-{row['join_month']:02d}"
+    return f"{row['join_year']} {dict(SemesterStats.TERM_CHOICES)[row['join_term']]}"
+
+
+def _member_trend_rows(start, end, granularity):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Unknown granularity {granularity!r}.')
+
+    # Periods run oldest first, Spring before Fall. The old query sorted
+    # the term names alphabetically, which put Fall first within a year.
+    if start is None and end is None and granularity == 'term':
+        return (SemesterStats.objects
+                .filter(member_count__gt=0)
+                .order_by('year', 'term')
+                .values('year', 'term', 'member_count'))
+
+    # Ad hoc ranges group on the precomputed join_* columns, which the
+    # join period index covers.
+    qs = OrgMember.objects.all()
+    if start is not None:
+        qs = qs.filter(join_year__gte=start.year, date_joined__gte=start)
+    if end is not None:
+        qs = qs.filter(join_year__lte=end.year, date_joined__lte=end)
+
+    keys = GRANULARITIES[granularity]
+    return qs.values(*keys).annotate(member_count=Count('id')).order_by(*keys)
+
+
+def _member_trends(rows, granularity):
+    if rows and 'term' in rows[0]:
+        terms = dict(SemesterStats.TERM_CHOICES)
+        labels = [f"{row['year']} {terms[row['term']]}" for row in rows]
+    else:
+        labels = [_period_label(row, granularity) for row in rows]
+
+    return {
+        'labels': labels,
+        'member_counts': [row['member_count'] for row in rows]
+    }
+
+
+def member_trends(start=None, end=None, granularity='term'):
+    rows = list(_member_trend_rows(start, end, granularity))
+    return _member_trends(rows, granularity)
+
+
+async def amember_trends(start=None, end=None, granularity='term'):
+    rows = await _alist(_member_trend_rows(start, end, granularity))
+    return _member_trends(rows, granularity)
+
+
+def _dashboard_stats(college_rows, student_program_rows, top_organization_rows, trend_rows):
+    # The radar and doughnut charts are both per-college totals, so they
+    # share a single read of the college counters.
+    return {
+        'org_participation': _org_participation(college_rows),
+        'student_programs': _student_programs(student_program_rows),
+        'top_organizations': _top_organizations(top_organization_rows),
+        'member_trends': _member_trends(trend_rows, 'term'),
+        'program_distribution': _program_distribution(college_rows),
+    }
+
+
+def dashboard_stats():
+    return _dashboard_stats(
+        list(_college_rows()),
+        list(_student_program_rows()),
+        list(_top_organization_rows()),
+        list(_member_trend_rows(None, None, 'term')),
+    )
+
+
+async def adashboard_stats():
+    return _dashboard_stats(
+        await _alist(_college_rows()),
+        await _alist(_student_program_rows()),
+        await _alist(_top_organization_rows()),
+        await _alist(_member_trend_rows(None, None, 'term')),
+    )
@@ -0,0 +1,19 @@
+from django.contrib.staticfiles import finders
+from django.core.checks import Tags, Warning, register
+
+from studentorg.assets import VENDORED
+
+
+@register(Tags.staticfiles, deploy=True)
+def check_vendored_assets(app_configs, **kwargs):
+    """Warn about CDN assets that have not been vendored, which pages keep
+    loading from the CDN and so need network access for."""
+    return [
+        Warning(
+            f'{name} has not been vendored; pages load it from {url}.',
+            hint='Run "manage.py vendor_assets" and commit static/vendor/.',
+            id='studentorg.W001',
+        )
+        for name, url in VENDORED.items()
+        if not finders.find(name)
+    ]
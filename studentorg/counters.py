@@ -0,0 +1,162 @@
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+
+from studentorg import cache
+from studentorg.models import College, Program, Organization, Student, OrgMember, SemesterStats
+
+
+def bump(model, lookup, create=False, **deltas):
+    """Add ``deltas`` to the counter columns of the rows matching ``lookup``.
+
+    With ``create``, a missing row is created for increments only; a
+    decrement against a missing row means its parent is being deleted, so
+    there is nothing left to count.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not updates:
+        return
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    if not create or any(delta < 0 for delta in deltas.values()):
+        return
+    model.objects.get_or_create(**lookup)
+    model.objects.filter(**lookup).update(**updates)
+
+
+def semester_bucket(date):
+    return {'year': date.year, 'term': SemesterStats.term_for(date)}
+
+
+def _count(qs, key):
+    """Correlated COUNT of ``qs`` rows whose ``key`` is the outer row."""
+    counted = (qs.filter(**{key: OuterRef('pk')}).order_by()
+               .values(key).annotate(n=Count('pk')).values('n'))
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+# Counter column -> how to count it from the base tables.
+COUNTERS = {
+    College: {
+        'organization_count': lambda: _count(Organization.objects.all(), 'college'),
+        'program_count': lambda: _count(Program.objects.all(), 'college'),
+    },
+    Program: {
+        'student_count': lambda: _count(Student.objects.all(), 'program'),
+        'member_count': lambda: _count(OrgMember.objects.all(), 'student__program'),
+    },
+    Organization: {
+        'member_count': lambda: _count(OrgMember.objects.all(), 'organization'),
+    },
+}
+
+
+# Counted model -> (counter model, key to its row, counter column), the
+# grouped form of the contributions in studentorg/signals.py.
+PARENTS = {
+    Program: [(College, 'college', 'program_count')],
+    Organization: [(College, 'college', 'organization_count')],
+    Student: [(Program, 'program', 'student_count')],
+    OrgMember: [
+        (Organization, 'organization', 'member_count'),
+        (Program, 'student__program', 'member_count'),
+    ],
+}
+
+
+def drift(model, field, pks=None):
+    """Rows of ``model`` whose ``field`` disagrees with the base tables,
+    as (pk, expected) pairs; only the rows in ``pks`` when given."""
+    qs = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return list(qs
+                .annotate(expected=COUNTERS[model][field]())
+                .exclude(**{field: F('expected')})
+                .values_list('pk', 'expected'))
+
+
+def remove(qs):
+    """Take the rows of ``qs`` out of the counters they contribute to.
+
+    Call it just before deleting the rows without signals, in the same
+    transaction. Each counter row is decremented once with a grouped count,
+    so the cost follows the number of parents, not of rows.
+    """
+    qs = qs.order_by()
+    for parent, key, field in PARENTS.get(qs.model, ()):
+        for pk, n in qs.values(key).annotate(n=Count('pk')).values_list(key, 'n'):
+            if pk is not None:
+                bump(parent, {'pk': pk}, **{field: -n})
+    if qs.model is OrgMember:
+        buckets = qs.values('join_year', 'join_term').annotate(n=Count('pk'))
+        for year, term, n in buckets.values_list('join_year', 'join_term', 'n'):
+            bump(SemesterStats, {'year': year, 'term': term}, member_count=-n)
+
+
+def refresh(model, pks, batch_size=1000):
+    """Reconcile the counters of the ``model`` rows in ``pks`` only."""
+    pks = [pk for pk in pks if pk is not None]
+    if not pks:
+        return
+    for field in COUNTERS[model]:
+        rows = drift(model, field, pks)
+        if rows:
+            model.objects.bulk_update(
+                [model(pk=pk, **{field: expected}) for pk, expected in rows],
+                [field], batch_size=batch_size)
+
+
+def refresh_semesters(buckets):
+    """Recount the (year, term) semester buckets in ``buckets``."""
+    for year, term in buckets:
+        n = OrgMember.objects.filter(join_year=year, join_term=term).count()
+        SemesterStats.objects.update_or_create(
+            year=year, term=term, defaults={'member_count': n})
+
+
+def _semesters():
+    semesters = {}
+    months = (OrgMember.objects
+              .annotate(year=ExtractYear('date_joined'), month=ExtractMonth('date_joined'))
+              .values('year', 'month')
+              .annotate(n=Count('id'))
+              .values_list('year', 'month', 'n'))
+    for year, month, n in months:
+        term = SemesterStats.SPRING if month <= 6 else SemesterStats.FALL
+        semesters[(year, term)] = semesters.get((year, term), 0) + n
+    return semesters
+
+
+def rebuild(batch_size=1000, dry_run=False):
+    """Reconcile every counter with the base tables.
+
+    Only rows that drifted are written. Returns the number of drifted rows
+    per counter, e.g. ``{'Organization.member_count': 2}``.
+    """
+    report = {}
+    with transaction.atomic():
+        for model, fields in COUNTERS.items():
+            for field in fields:
+                rows = drift(model, field)
+                report[f'{model.__name__}.{field}'] = len(rows)
+                if dry_run or not rows:
+                    continue
+                model.objects.bulk_update(
+                    [model(pk=pk, **{field: expected}) for pk, expected in rows],
+                    [field], batch_size=batch_size)
+
+        semesters = _semesters()
+        current = {(row.year, row.term): row.member_count
+                   for row in SemesterStats.objects.all()}
+        report['SemesterStats.member_count'] = sum(
+            1 for key in semesters.keys() | current.keys()
+            if semesters.get(key, 0) != current.get(key, 0))
+        if not dry_run:
+            SemesterStats.objects.all().delete()
+            SemesterStats.objects.bulk_create(
+                SemesterStats(year=year, term=term, member_count=n)
+                for (year, term), n in semesters.items()
+            )
+
+    if not dry_run:
+        cache.touch(College, Program, Organization, Student, OrgMember)
+    return report
@@ -0,0 +1,102 @@
+from django.db import connections, models, router, transaction
+
+from studentorg import cache, counters
+from studentorg.models import College, Program, Organization, Student, OrgMember
+
+
+CHUNK_SIZE = 2000
+
+
+def _chunks(pks, size):
+    for start in range(0, len(pks), size):
+        yield pks[start:start + size]
+
+
+def _depths(model, depth=1, depths=None):
+    """{model: depth} for every model a delete of ``model`` cascades to,
+    found through the on_delete=CASCADE foreign keys. A model reached along
+    several paths gets its deepest one."""
+    depths = {} if depths is None else depths
+    for rel in model._meta.related_objects:
+        if rel.on_delete is models.CASCADE:
+            depths[rel.related_model] = max(depth, depths.get(rel.related_model, 0))
+            _depths(rel.related_model, depth + 1, depths)
+    return depths
+
+
+def plan(obj, using=None, chunk_size=CHUNK_SIZE):
+    """Primary keys to delete for ``obj``, as (model, pks) pairs with
+    children before parents.
+
+    Models are resolved top down, once each: a model's rows are the ones
+    whose cascading foreign keys point at rows already found, looked up
+    through the indexes on those keys. A model reached along several paths
+    (a student belongs to a college directly and through its program)
+    gathers the rows of all of them.
+    """
+    root = type(obj)
+    depths = _depths(root)
+    found = {root: [obj.pk]}
+    for model in sorted(depths, key=depths.get):
+        pks = set()
+        for field in model._meta.concrete_fields:
+            if (field.remote_field is None or field.remote_field.on_delete is not models.CASCADE
+                    or field.related_model not in found):
+                continue
+            for parents in _chunks(found[field.related_model], chunk_size):
+                qs = model.objects.using(using).filter(**{f'{field.attname}__in': parents})
+                pks.update(qs.values_list('pk', flat=True))
+        found[model] = sorted(pks)
+    return [(model, found[model]) for model in sorted(depths, key=lambda model: -depths[model])] + [
+        (root, found[root])]
+
+
+def preview(obj):
+    """What deleting ``obj`` takes with it, as (verbose_name_plural, count)
+    pairs; models with nothing to delete are left out."""
+    return [(model._meta.verbose_name_plural, len(pks))
+            for model, pks in plan(obj)[:-1] if pks]
+
+
+def _delete_rows(model, pks, using):
+    """DELETE the ``model`` rows in ``pks`` with one statement, without
+    signals; returns the number of rows deleted."""
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', pks)
+        return cursor.rowcount
+
+
+def delete(obj, chunk_size=CHUNK_SIZE, progress=None):
+    """Delete ``obj`` and everything cascading from it with set-based SQL.
+
+    The rows are resolved once by plan(), then deleted ``chunk_size`` at a
+    time by primary key, each chunk in its own transaction together with
+    the counter decrements for its rows, so a large college never holds the
+    write lock for long and the counters stay right even if the run is
+    interrupted. Children go before their parents, so an interrupted run
+    leaves no dangling foreign key and can simply be repeated. Returns the
+    number of rows deleted; ``progress(done, total)`` is called after every
+    chunk.
+    """
+    using = router.db_for_write(type(obj))
+    steps = plan(obj, using, chunk_size)
+    total = sum(len(pks) for _, pks in steps)
+    done = 0
+    for model, pks in steps:
+        for chunk in _chunks(pks, chunk_size):
+            with transaction.atomic(using=using):
+                # No per-object signals, so the counters the receivers
+                # would have decremented are adjusted here. The FTS
+                # triggers keep the search index in step.
+                counters.remove(model.objects.using(using).filter(pk__in=chunk))
+                done += _delete_rows(model, chunk, using)
+            if progress:
+                progress(done, total)
+
+    if done:
+        cache.touch(College, Program, Organization, Student, OrgMember)
+    return done
@@ -0,0 +1,120 @@
+import csv
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from studentorg.models import College, Program, Organization, Student, OrgMember
+from studentorg.search import search
+
+
+# Exported columns per entity, as values_list() paths so related names are
+# joined in the same query instead of loaded per row.
+EXPORTS = {
+    'students': (Student, [
+        'id', 'student_id', 'lastname', 'firstname', 'middlename',
+        'program__prog_name', 'college__college_name',
+    ]),
+    'members': (OrgMember, [
+        'id', 'student__student_id', 'student__lastname', 'student__firstname',
+        'organization__name', 'date_joined',
+    ]),
+    'organizations': (Organization, ['id', 'name', 'college__college_name', 'description']),
+    'programs': (Program, ['id', 'prog_name', 'college__college_name']),
+    'colleges': (College, ['id', 'college_name']),
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def rows(entity, query=None):
+    """The rows of an export, oldest first, as a values_list queryset."""
+    model, fields = EXPORTS[entity]
+    qs = search(model.objects.all(), query)
+    return qs.order_by('id').values_list(*fields)
+
+
+def _encoder(entity, fmt):
+    """(header line or None, function encoding one row) for ``fmt``."""
+    _, fields = EXPORTS[entity]
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        return writer.writerow(fields), writer.writerow
+    if fmt == 'jsonl':
+        encoder = DjangoJSONEncoder()
+        return None, lambda row: encoder.encode(dict(zip(fields, row))) + '\n'
+    raise ValueError(f'Unknown export format {fmt!r}.')
+
+
+def lines(entity, fmt='csv', query=None, chunk_size=None):
+    """Yield the export as text, a chunk of rows at a time."""
+    chunk_size = chunk_size or CHUNK_SIZE
+    header, encode = _encoder(entity, fmt)
+    if header:
+        yield header
+
+    buffer = []
+    for row in rows(entity, query).iterator(chunk_size=chunk_size):
+        buffer.append(encode(row))
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def alines(entity, fmt='csv', query=None, chunk_size=None):
+    """lines() as an async generator, for streaming responses under ASGI.
+
+    Each chunk is produced by a trip to the database thread, so the body is
+    never held in memory at once. (aiterator() can't be used here: it runs
+    values_list() queries in the event loop.)
+    """
+    chunks = lines(entity, fmt, query=query, chunk_size=chunk_size)
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+def encoded(chunks, compress=False):
+    """Encode text chunks to bytes, gzipping them on the fly if asked."""
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def aencoded(chunks, compress=False):
+    """encoded() for the async chunks of alines()."""
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode()) if compressor else chunk.encode()
+        if data:
+            yield data
+    if compressor:
+        yield compressor.flush()
+
+
+def filename(entity, fmt, compress=False):
+    return f"{entity}.{FORMATS[fmt][1]}{'.gz' if compress else ''}"
+
+
+def content_type(fmt, compress=False):
+    return 'application/gzip' if compress else FORMATS[fmt][0]
@@ -1,17 +1,23 @@
 from django.forms import ModelForm, DateInput
 from django import forms
 from .models import Organization, OrgMember, Student, College, Program
+from .widgets import AutocompleteSelect
 
 class OrganizationForm(ModelForm):
     class Meta:
         model = Organization
-        fields = "__all__" 
+        fields = "__all__"
+        widgets = {
+            'college': AutocompleteSelect('college')
+        }
 
 class OrgMemberForm(ModelForm):
     class Meta:
         model = OrgMember
         fields = "__all__"
         widgets = {
+            'student': AutocompleteSelect('student'),
+            'organization': AutocompleteSelect('organization'),
             'date_joined': DateInput(attrs={'type': 'date'})
         }
 
@@ -19,6 +25,10 @@ class StudentForm(ModelForm):
     class Meta:
         model = Student
         fields = "__all__"
+        widgets = {
+            'program': AutocompleteSelect('program'),
+            'college': AutocompleteSelect('college')
+        }
 
 class CollegeForm(ModelForm):
     class Meta:
@@ -28,4 +38,11 @@ class CollegeForm(ModelForm):
 class ProgramForm(ModelForm):
     class Meta:
         model = Program
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+        widgets = {
+            'college': AutocompleteSelect('college')
+        }
+
+class ImportForm(forms.Form):
+    kind = forms.ChoiceField(choices=[('students', 'Students'), ('members', 'Org. Members')])
+    file = forms.FileField(help_text='CSV with a header row.')
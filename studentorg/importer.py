@@ -0,0 +1,207 @@
+import csv
+import io
+from itertools import islice
+
+from django.db import transaction
+
+from studentorg import cache, counters
+from studentorg.forms import OrgMemberForm, StudentForm
+from studentorg.models import College, Program, Organization, Student, OrgMember, SemesterStats
+
+
+BATCH_SIZE = 1000
+
+
+class StudentRowForm(StudentForm):
+    """StudentForm's field rules minus the foreign keys, which an import
+    resolves by name for a whole batch at once."""
+
+    class Meta(StudentForm.Meta):
+        fields = ['student_id', 'lastname', 'firstname', 'middlename']
+
+    def validate_unique(self):
+        # Existing student ids are updated by the upsert, not rejected.
+        pass
+
+
+class OrgMemberRowForm(OrgMemberForm):
+    class Meta(OrgMemberForm.Meta):
+        fields = ['date_joined']
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+
+    @property
+    def rows(self):
+        return self.created + self.updated + len(self.errors)
+
+    def error(self, line, errors):
+        self.errors.append({'line': line, 'errors': errors})
+
+    def write_errors(self, out):
+        writer = csv.writer(out)
+        writer.writerow(['line', 'field', 'error'])
+        for row in self.errors:
+            for field, messages in row['errors'].items():
+                for message in messages:
+                    writer.writerow([row['line'], field, message])
+
+
+def _by_name(model, field, names, *values):
+    """Map each name to the values of the oldest row carrying it."""
+    found = {}
+    rows = (model.objects.filter(**{f'{field}__in': names})
+            .order_by('-id').values_list(field, *values))
+    for name, *rest in rows:
+        found[name] = rest[0] if len(rest) == 1 else tuple(rest)
+    return found
+
+
+def _batches(reader, size):
+    # Data starts on line 2, after the header.
+    numbered = enumerate(reader, start=2)
+    while True:
+        batch = list(islice(numbered, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _upsert(model, objects, unique_fields, update_fields):
+    with transaction.atomic():
+        model.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields + ['updated_at'],
+        )
+
+
+def _import_students(batch, report):
+    programs = _by_name(Program, 'prog_name',
+                        {row.get('program', '').strip() for _, row in batch},
+                        'id', 'college_id')
+    colleges = _by_name(College, 'college_name',
+                        {row.get('college', '').strip() for _, row in batch}, 'id')
+
+    students = {}
+    for line, row in batch:
+        form = StudentRowForm(data=row)
+        errors = {} if form.is_valid() else dict(form.errors)
+        program = programs.get(row.get('program', '').strip())
+        if program is None:
+            errors['program'] = [f"Unknown program {row.get('program', '')!r}."]
+        college_name = row.get('college', '').strip()
+        if college_name and college_name not in colleges:
+            errors['college'] = [f'Unknown college {college_name!r}.']
+        if errors:
+            report.error(line, errors)
+            continue
+
+        student = form.instance
+        student.program_id = program[0]
+        student.college_id = colleges[college_name] if college_name else program[1]
+        # A student id repeated within a batch keeps its last row.
+        students[student.student_id] = student
+
+    existing = dict(Student.objects.filter(student_id__in=students)
+                    .values_list('student_id', 'program_id'))
+    # Upserts bypass model signals; recount the programs students joined
+    # or left in the same transaction.
+    programs = {student.program_id for student in students.values()} | set(existing.values())
+    with transaction.atomic():
+        _upsert(Student, list(students.values()), ['student_id'],
+                ['lastname', 'firstname', 'middlename', 'program', 'college'])
+        counters.refresh(Program, programs)
+    report.updated += len(existing)
+    report.created += len(students) - len(existing)
+
+
+def _import_members(batch, report):
+    students = _by_name(Student, 'student_id',
+                        {row.get('student_id', '').strip() for _, row in batch}, 'id')
+    organizations = _by_name(Organization, 'name',
+                             {row.get('organization', '').strip() for _, row in batch}, 'id')
+
+    members = {}
+    for line, row in batch:
+        form = OrgMemberRowForm(data=row)
+        errors = {} if form.is_valid() else dict(form.errors)
+        student = students.get(row.get('student_id', '').strip())
+        organization = organizations.get(row.get('organization', '').strip())
+        if student is None:
+            errors['student_id'] = [f"Unknown student {row.get('student_id', '')!r}."]
+        if organization is None:
+            errors['organization'] = [f"Unknown organization {row.get('organization', '')!r}."]
+        if errors:
+            report.error(line, errors)
+            continue
+
+        member = form.instance
+        member.student_id = student
+        member.organization_id = organization
+        members[(student, organization)] = member
+
+    previous = {(student, organization): (year, term) for student, organization, year, term in
+                OrgMember.objects
+                .filter(student_id__in={key[0] for key in members},
+                        organization_id__in={key[1] for key in members})
+                .values_list('student_id', 'organization_id', 'join_year', 'join_term')}
+    existing = set(previous) & set(members)
+    # As for students, recount only the organizations, programs and
+    # semesters this batch touched, including the semesters that updated
+    # memberships moved out of.
+    organizations = {key[1] for key in members}
+    programs = set(Student.objects.filter(pk__in={key[0] for key in members})
+                   .values_list('program_id', flat=True))
+    semesters = {previous[key] for key in existing}
+    semesters |= {(member.date_joined.year, SemesterStats.term_for(member.date_joined))
+                  for member in members.values()}
+    with transaction.atomic():
+        _upsert(OrgMember, list(members.values()), ['student', 'organization'],
+                ['date_joined', 'join_year', 'join_month', 'join_term'])
+        counters.refresh(Organization, organizations)
+        counters.refresh(Program, programs)
+        counters.refresh_semesters(semesters)
+    report.updated += len(existing)
+    report.created += len(members) - len(existing)
+
+
+IMPORTERS = {
+    'students': (_import_students, ['student_id', 'lastname', 'firstname', 'program']),
+    'members': (_import_members, ['student_id', 'organization', 'date_joined']),
+}
+
+
+def run(kind, f, batch_size=BATCH_SIZE, progress=None):
+    """Import a CSV file of ``kind`` ('students' or 'members').
+
+    ``f`` may be a text or binary file object; it is read one batch at a
+    time. Names in the program, college and organization columns are
+    resolved with one query per batch and rows are upserted on student_id
+    or on (student, organization).
+    """
+    if isinstance(f.read(0), bytes):
+        f = io.TextIOWrapper(f, encoding='utf-8-sig', newline='')
+    importer, required = IMPORTERS[kind]
+    # Short rows get '' rather than None for their missing cells, which
+    # the forms then report as required fields.
+    reader = csv.DictReader(f, restval='')
+    missing = [column for column in required if column not in (reader.fieldnames or [])]
+    report = ImportReport()
+    if missing:
+        report.error(1, {'header': [f"Missing column {column!r}." for column in missing]})
+        return report
+
+    for batch in _batches(reader, batch_size):
+        importer(batch, report)
+        if progress:
+            progress(report)
+
+    if report.created or report.updated:
+        cache.touch(College, Program, Organization, Student, OrgMember)
+    return report
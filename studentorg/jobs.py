@@ -0,0 +1,181 @@
+import io
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+
+from studentorg import deletion
+from studentorg.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+# A database-backed job queue. enqueue() stores a Job row; `manage.py
+# run_worker` processes claim due jobs one at a time, run the task named by
+# ``kind`` with the job's ``args`` and record progress, result and errors on
+# the row, which the job status endpoint serves. Failed jobs are retried
+# with exponential backoff until ``max_attempts`` is used up.
+
+
+def _delete(progress, model, pk):
+    obj = apps.get_model(model).objects.filter(pk=pk).first()
+    if obj is None:
+        # Finished by an earlier attempt.
+        return {'deleted': 0}
+    return {'deleted': deletion.delete(obj, progress=progress)}
+
+
+# Commands that may be queued with `--background`.
+COMMANDS = ('create_initial_data', 'rebuild_counters')
+
+
+def _heartbeat(progress, stop):
+    # Commands don't report progress, so beat often enough that a long one
+    # is never mistaken for a dead worker by requeue_stale().
+    interval = settings.JOB_STALE_SECONDS / 4
+    try:
+        while not stop.wait(interval):
+            progress(0)
+    finally:
+        connections.close_all()
+
+
+def _command(progress, name, options):
+    if name not in COMMANDS:
+        raise ValueError(f'{name} cannot run as a job.')
+    out = io.StringIO()
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(progress, stop), daemon=True)
+    heartbeat.start()
+    try:
+        call_command(name, stdout=out, **options)
+    finally:
+        stop.set()
+        heartbeat.join()
+    return {'output': out.getvalue()}
+
+
+TASKS = {
+    'delete': _delete,
+    'command': _command,
+}
+
+
+def enqueue(kind, args=None, max_attempts=3):
+    """Queue the task ``kind`` and return its Job.
+
+    With JOB_QUEUE_INLINE the job is run before this returns, for
+    development without a worker.
+    """
+    if kind not in TASKS:
+        raise ValueError(f'Unknown job kind {kind!r}.')
+    job = Job.objects.create(kind=kind, args=args or {}, max_attempts=max_attempts)
+    if settings.JOB_QUEUE_INLINE:
+        job = claim('inline', pk=job.pk)
+        execute(job)
+        job.refresh_from_db()
+    return job
+
+
+def claim(worker, pk=None):
+    """Mark the oldest due job as running for ``worker`` and return it, or
+    None when nothing is due.
+
+    The conditional UPDATE is the lock: of several workers reading the same
+    candidate, only the one whose UPDATE matches still-queued gets it.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+    if pk is not None:
+        due = due.filter(pk=pk)
+    for candidate in due.order_by('run_after', 'id').values_list('pk', flat=True)[:10]:
+        claimed = Job.objects.filter(pk=candidate, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, attempts=F('attempts') + 1,
+            started_at=now, updated_at=now, error='')
+        if claimed:
+            return Job.objects.get(pk=candidate)
+    return None
+
+
+def execute(job):
+    def progress(done, total=None):
+        # updated_at doubles as the heartbeat requeue_stale() looks at.
+        Job.objects.filter(pk=job.pk).update(
+            progress=done, total=total, updated_at=timezone.now())
+
+    try:
+        result = TASKS[job.kind](progress, **job.args)
+    except Exception:
+        logger.exception('Job %s failed (attempt %s of %s)', job.pk, job.attempts, job.max_attempts)
+        _failed(job, traceback.format_exc())
+    else:
+        now = timezone.now()
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.DONE, result=result, finished_at=now, updated_at=now)
+
+
+def _failed(job, error):
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.QUEUED, run_after=now + timedelta(seconds=delay),
+            error=error, updated_at=now)
+    else:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.FAILED, error=error, finished_at=now, updated_at=now)
+
+
+def requeue_stale(timeout=None):
+    """Hand running jobs whose worker went quiet for ``timeout`` seconds
+    (JOB_STALE_SECONDS) back to the queue, or fail them if they are out of
+    attempts. Returns how many were found."""
+    cutoff = timezone.now() - timedelta(seconds=timeout or settings.JOB_STALE_SECONDS)
+    stale = list(Job.objects.filter(status=Job.RUNNING, updated_at__lt=cutoff))
+    for job in stale:
+        _failed(job, f'Worker {job.worker} stopped responding.')
+    return len(stale)
+
+
+def work(poll=1.0, once=False):
+    """Run jobs until interrupted, sleeping ``poll`` seconds while the queue
+    is empty; with ``once``, return as soon as it is."""
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    while True:
+        close_old_connections()
+        job = claim(worker)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll)
+            continue
+        logger.info('Job %s (%s) claimed by %s', job.pk, job.kind, worker)
+        execute(job)
+
+
+def describe(job):
+    """The job's state as served by the job status endpoint."""
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'total': job.total,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'result': job.result,
+        'error': job.error.strip().splitlines()[-1] if job.error else None,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from studentorg import audit
+
+
+class Command(BaseCommand):
+    help = 'Explain the chart and list view queries and flag full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--query', default='a',
+                            help='Search term used for the list views.')
+        parser.add_argument('--plans', action='store_true',
+                            help='Print the plan of every statement.')
+        parser.add_argument('--fail', action='store_true',
+                            help='Exit with an error when a full scan is found.')
+
+    def handle(self, *args, **options):
+        targets = (audit.chart_targets() + audit.list_targets(options['query'])
+                   + audit.autocomplete_targets(options['query']))
+        try:
+            results = audit.audit(targets, options['database'])
+        except NotImplementedError as e:
+            raise CommandError(e)
+
+        flagged = 0
+        for result in results:
+            if result['full_scans']:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(
+                    f"{result['target']}: full scan of {', '.join(result['full_scans'])}"))
+            elif not options['plans']:
+                continue
+            else:
+                self.stdout.write(f"{result['target']}: ok")
+            self.stdout.write(f"  {result['sql']}")
+            for line in result['plan']:
+                self.stdout.write(f'    {line}')
+
+        summary = f'{len(results)} statements explained, {flagged} with full scans.'
+        if flagged and options['fail']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary) if not flagged else summary)
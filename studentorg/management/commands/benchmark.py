@@ -0,0 +1,90 @@
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.runner import DiscoverRunner
+from studentorg import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every page and endpoint against a freshly seeded test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--colleges', type=int, default=8)
+        parser.add_argument('--programs', type=int, default=40)
+        parser.add_argument('--orgs', type=int, default=50)
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--members', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--deep-page', type=int, default=200)
+        parser.add_argument('--only', nargs='*', default=None,
+                            help='Only run scenarios whose name starts with one of these.')
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--baseline', default=None,
+                            help='Report to compare against; regressions fail the run.')
+        parser.add_argument('--tolerance', type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        # The test runner gives us a throwaway database, so the configured
+        # one is never touched.
+        runner = DiscoverRunner(interactive=False, verbosity=0)
+        runner.setup_test_environment()
+        databases = runner.setup_databases()
+        try:
+            report = self.benchmark(options)
+        finally:
+            runner.teardown_databases(databases)
+            runner.teardown_test_environment()
+
+        benchmark.save(report, options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}."))
+
+        if options['baseline']:
+            regressions, warnings = benchmark.compare(
+                report, benchmark.load(options['baseline']), options['tolerance'])
+            for warning in warnings:
+                self.stdout.write(self.style.WARNING(f'Warning: {warning}'))
+            if warnings and not regressions:
+                return
+            if regressions:
+                raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+    def benchmark(self, options):
+        scale = {key: options[key] for key in ('colleges', 'programs', 'orgs', 'students', 'members')}
+        self.stdout.write(f'Seeding {scale}...')
+        benchmark.seed(seed=options['seed'], **scale)
+
+        client = Client()
+        client.force_login(User.objects.create_superuser('benchmark', 'benchmark@example.com', None))
+
+        scenarios = benchmark.build_scenarios(deep_page=options['deep_page'])
+        for name in benchmark.uncovered_urls(scenarios):
+            self.stdout.write(self.style.WARNING(f'No scenario covers URL {name!r}.'))
+        if options['only']:
+            scenarios = [s for s in scenarios if s.name.startswith(tuple(options['only']))]
+
+        results = benchmark.run(client, scenarios, options['iterations'])
+
+        self.stdout.write(f"{'scenario':<32}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'queries':>9}{'bytes':>10}")
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<32}{row['p50_ms']:>10.2f}{row['p90_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+                f"{row['queries']:>9}{row['bytes']:>10}")
+
+        return {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'iterations': options['iterations'],
+                'scale': scale,
+            },
+            'scenarios': results,
+        }
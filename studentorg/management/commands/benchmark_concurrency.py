@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from studentorg import benchmark, charts, throughput
+from studentorg.models import Organization, OrgMember, Student
+
+
+class Command(BaseCommand):
+    help = 'Compare mixed read/write throughput under each SQLite connection profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--writes', type=int, default=1,
+                            help='Enrollments per four reads.')
+        parser.add_argument('--profiles', nargs='*', default=sorted(settings.SQLITE_OPTIONS))
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--members', type=int, default=10000)
+        parser.add_argument('--output', default=None)
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('The connection profiles only differ on SQLite.')
+
+        # Each profile gets its own copy of one seeded file: WAL mode sticks
+        # to a database once set, and the runs must not see each other's
+        # enrollments.
+        with tempfile.TemporaryDirectory() as directory:
+            template = os.path.join(directory, 'template.sqlite3')
+            self.use(template, 'stock')
+            call_command('migrate', verbosity=0)
+            benchmark.seed(colleges=8, programs=40, orgs=50, students=options['students'],
+                           members=options['members'], seed=1)
+
+            results = {}
+            for profile in options['profiles']:
+                path = os.path.join(directory, f'{profile}.sqlite3')
+                connections.close_all()
+                shutil.copy(template, path)
+                self.use(path, profile)
+                operations = self.operations()
+                names = ['dashboard', 'students', 'dashboard', 'students'] + ['enroll'] * options['writes']
+                results[profile] = throughput.measure(
+                    throughput.drive_orm, operations, names,
+                    options['requests'], options['concurrency'])
+            connections.close_all()
+
+        self.stdout.write(f"{'':<8}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name, row in results.items():
+            self.stdout.write(f"{name:<8}{row['rps']:>10.1f}{row['p50_ms']:>10.2f}"
+                              f"{row['p99_ms']:>10.2f}{row['errors']:>8}")
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+
+    def use(self, path, profile):
+        # Connections are created per thread from this dict, so every
+        # worker picks the profile up.
+        settings_dict = connections[DEFAULT_DB_ALIAS].settings_dict
+        settings_dict.update(settings.DATABASE_PROFILES[profile])
+        settings_dict['OPTIONS'] = settings.SQLITE_OPTIONS[profile]
+        settings_dict['NAME'] = path
+        connections.close_all()
+
+    def operations(self):
+        members = set(OrgMember.objects.values_list('student_id', 'organization_id'))
+        organization_ids = list(Organization.objects.values_list('id', flat=True))
+        pending = iter([
+            (student_id, organization_id)
+            for student_id in Student.objects.values_list('id', flat=True)
+            for organization_id in organization_ids
+            if (student_id, organization_id) not in members
+        ])
+        lock = threading.Lock()
+
+        def enroll():
+            with lock:
+                student_id, organization_id = next(pending)
+            OrgMember.objects.create(student_id=student_id, organization_id=organization_id,
+                                     date_joined=date.today())
+
+        return {
+            'dashboard': charts.dashboard_stats,
+            'students': lambda: list(Student.objects.select_related('program')
+                                     .order_by('-created_at', '-id')[:10]),
+            'enroll': enroll,
+        }
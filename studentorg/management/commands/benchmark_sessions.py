@@ -0,0 +1,99 @@
+import json
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from studentorg import benchmark
+
+
+BACKENDS = {
+    'stock': 'django.contrib.auth.backends.ModelBackend',
+    'cached': 'studentorg.auth.CachedModelBackend',
+}
+
+# Login-required pages served by sync views, whose queries all run on this
+# thread where CaptureQueriesContext sees them.
+PAGES = ['home', 'import']
+
+
+class Command(BaseCommand):
+    help = 'Compare queries per authenticated page view under each session profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--profiles', nargs='*', default=list(settings.SESSION_ENGINES))
+        parser.add_argument('--output', default=None)
+
+    def handle(self, *args, **options):
+        runner = DiscoverRunner(interactive=False, verbosity=0)
+        runner.setup_test_environment()
+        databases = runner.setup_databases()
+        # The cached profiles are only allowed on a shared cache; measure
+        # them on the file-based one a deployment would use.
+        directory = tempfile.TemporaryDirectory()
+        shared_cache = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directory.name,
+        }}
+        try:
+            benchmark.seed(colleges=8, programs=40, orgs=50, students=500, members=2000, seed=1)
+            user = User.objects.create_superuser('benchmark', 'benchmark@example.com', None)
+            results = {}
+            with override_settings(CACHES=shared_cache):
+                for profile in options['profiles']:
+                    for backend in BACKENDS:
+                        results[f'{profile}/{backend}'] = self.measure(
+                            user, profile, backend, options['iterations'])
+        finally:
+            directory.cleanup()
+            runner.teardown_databases(databases)
+            runner.teardown_test_environment()
+
+        self.stdout.write(f"{'profile/backend':<26}{'queries':>9}{'session':>9}{'auth':>7}{'p50 ms':>9}")
+        for name, row in results.items():
+            self.stdout.write(f"{name:<26}{row['queries']:>9}{row['session_queries']:>9}"
+                              f"{row['auth_queries']:>7}{row['p50_ms']:>9.2f}")
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+
+    def measure(self, user, profile, backend, iterations):
+        with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[profile],
+                               AUTHENTICATION_BACKENDS=[BACKENDS[backend]]):
+            cache.clear()
+            client = Client()
+            client.force_login(user)
+            paths = [reverse(name) for name in PAGES]
+            for path in paths:
+                client.get(path)
+
+            samples = []
+            for _ in range(iterations):
+                for path in paths:
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        response = client.get(path)
+                        elapsed = time.perf_counter() - started
+                    assert response.status_code == 200, f'{path} returned {response.status_code}'
+                    sql = [query['sql'] for query in queries.captured_queries]
+                    samples.append((
+                        elapsed * 1000, len(sql),
+                        sum('"django_session"' in q for q in sql),
+                        sum('"auth_user"' in q for q in sql),
+                    ))
+
+        return {
+            'p50_ms': round(benchmark.percentile([s[0] for s in samples], 50), 3),
+            'queries': round(statistics.mean(s[1] for s in samples), 2),
+            'session_queries': round(statistics.mean(s[2] for s in samples), 2),
+            'auth_queries': round(statistics.mean(s[3] for s in samples), 2),
+        }
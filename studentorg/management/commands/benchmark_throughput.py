@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.runner import DiscoverRunner
+from studentorg import benchmark, throughput
+
+
+DEFAULT_PATHS = [
+    '/dashboard/stats/',
+    '/radarChartOrgParticipation/',
+    '/bubbleChartStudentPrograms/',
+    '/horizontalBarTopOrgs/',
+    '/stackedBarOrgMemberTrends/',
+    '/doughnutProgramDistribution/',
+    '/student_list/',
+    '/orgmember_list/',
+    '/organization_list',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare WSGI and ASGI throughput for the chart and list endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--paths', nargs='*', default=DEFAULT_PATHS)
+        parser.add_argument('--wsgi-url', default=None,
+                            help='Base URL of a running WSGI deployment (setup.wsgi).')
+        parser.add_argument('--asgi-url', default=None,
+                            help='Base URL of a running ASGI deployment (setup.asgi).')
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--members', type=int, default=10000)
+        parser.add_argument('--output', default=None)
+
+    def handle(self, *args, **options):
+        if options['wsgi_url'] or options['asgi_url']:
+            targets = [(name, throughput.drive_http, options[f'{name}_url'])
+                       for name in ('wsgi', 'asgi') if options[f'{name}_url']]
+            results = self.measure(targets, options)
+        else:
+            # Without deployments to load, drive the two application objects
+            # in process against a seeded throwaway database.
+            runner = DiscoverRunner(interactive=False, verbosity=0)
+            runner.setup_test_environment()
+            databases = runner.setup_databases()
+            try:
+                benchmark.seed(colleges=8, programs=40, orgs=50, students=options['students'],
+                               members=options['members'], seed=1)
+                from setup.asgi import application as asgi_application
+                from setup.wsgi import application as wsgi_application
+                results = self.measure([
+                    ('wsgi', throughput.drive_wsgi, wsgi_application),
+                    ('asgi', throughput.drive_asgi, asgi_application),
+                ], options)
+            finally:
+                runner.teardown_databases(databases)
+                runner.teardown_test_environment()
+
+        self.stdout.write(f"{'':<6}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name, row in results.items():
+            self.stdout.write(f"{name:<6}{row['rps']:>10.1f}{row['p50_ms']:>10.2f}"
+                              f"{row['p99_ms']:>10.2f}{row['errors']:>8}")
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+
+    def measure(self, targets, options):
+        paths = options['paths']
+        results = {}
+        for name, driver, target in targets:
+            # One untimed pass over the paths warms caches and connections.
+            driver(target, paths, len(paths), 1)
+            results[name] = throughput.measure(
+                driver, target, paths, options['requests'], options['concurrency'])
+        return results
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from studentorg import deletion, jobs
+from studentorg.models import College, Program, Organization
+
+
+MODELS = {
+    'college': College,
+    'program': Program,
+    'organization': Organization,
+}
+
+
+class Command(BaseCommand):
+    help = 'Delete a college, program or organization and everything cascading from it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(MODELS))
+        parser.add_argument('pk', type=int)
+        parser.add_argument('--chunk-size', type=int, default=deletion.CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report what would be deleted.')
+        parser.add_argument('--background', action='store_true',
+                            help='Queue the delete for run_worker instead of running it here.')
+
+    def handle(self, *args, **options):
+        model = MODELS[options['model']]
+        obj = model.objects.filter(pk=options['pk']).first()
+        if obj is None:
+            raise CommandError(f'{model.__name__} {options["pk"]} does not exist.')
+
+        for name, count in deletion.preview(obj):
+            self.stdout.write(f'{count} {name}')
+        if options['dry_run']:
+            return
+        if options['background']:
+            job = jobs.enqueue('delete', {'model': model._meta.label, 'pk': obj.pk})
+            self.stdout.write(f'Queued as job {job.pk}.')
+            return
+
+        def progress(done, total):
+            self.stdout.write(f'{done}/{total} rows deleted...')
+
+        done = deletion.delete(obj, options['chunk_size'], progress)
+        self.stdout.write(self.style.SUCCESS(f'{obj} deleted successfully ({done} rows).'))
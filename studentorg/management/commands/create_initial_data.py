@@ -1,57 +1,157 @@
-from django.core.management.base import BaseCommand
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from faker import Faker
+from studentorg import counters, jobs
 from studentorg.models import College, Program, Organization, Student, OrgMember
 
+# Names are drawn from pools generated once up front; calling Faker per row
+# dominates the run time at millions of rows.
+NAME_POOL_SIZE = 2000
+
+
 class Command(BaseCommand):
     help = 'Create initial data for the application'
 
-    def handle(self, *args, **kwargs):
-        self.create_organization(10)
-        self.create_students(50)
-        self.create_membership(10)
+    def add_arguments(self, parser):
+        parser.add_argument('--orgs', type=int, default=10)
+        parser.add_argument('--students', type=int, default=50)
+        parser.add_argument('--members', type=int, default=10)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Seed for reproducible data sets.')
+        parser.add_argument('--background', action='store_true',
+                            help='Queue the run for run_worker instead of running it here.')
+
+    def handle(self, *args, **options):
+        if options['background']:
+            names = ('orgs', 'students', 'members', 'batch_size', 'seed')
+            # Not retried: a second attempt would insert the rows again.
+            job = jobs.enqueue('command', {'name': 'create_initial_data', 'options': {
+                name: options[name] for name in names}}, max_attempts=1)
+            self.stdout.write(f'Queued as job {job.pk}.')
+            return
+
+        self.batch_size = options['batch_size']
+        self.random = random.Random(options['seed'])
+        Faker.seed(options['seed'])
+
+        self.create_organization(options['orgs'])
+        self.create_students(options['students'])
+        self.create_membership(options['members'])
+
+        started = time.perf_counter()
+        counters.rebuild()
+        self.stdout.write(
+            f'Dashboard counters rebuilt in {time.perf_counter() - started:.1f}s.')
+
+    def insert(self, model, rows, count, label):
+        # ignore_conflicts drops duplicates silently, so the rows inserted
+        # are counted rather than assumed to be ``count``.
+        before = model.objects.count()
+        started = time.perf_counter()
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.flush(model, batch)
+                batch = []
+        if batch:
+            self.flush(model, batch)
+
+        elapsed = time.perf_counter() - started
+        inserted = model.objects.count() - before
+        rate = inserted / elapsed if elapsed else 0
+        skipped = f', {count - inserted} duplicates skipped' if inserted < count else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'Initial data for {label} created successfully: '
+            f'{inserted} rows in {elapsed:.1f}s ({rate:,.0f} rows/s{skipped}).'
+        ))
+
+    def flush(self, model, batch):
+        # Rows colliding with existing unique student ids or memberships
+        # are skipped rather than aborting the run.
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=self.batch_size,
+                                      ignore_conflicts=True)
 
     def create_organization(self, count):
         fake = Faker()
-        
-        for _ in range(count):
-            words = [fake.word() for _ in range(2)]  # two words
-            organization_name = ' '.join(words)
-            Organization.objects.create(
-                name=organization_name.title(),
-                college=College.objects.order_by('?').first(),
-                description=fake.sentence()
+        words = [fake.word() for _ in range(NAME_POOL_SIZE)]
+        sentences = [fake.sentence() for _ in range(NAME_POOL_SIZE)]
+        colleges = list(College.objects.values_list('id', flat=True)) or [None]
+        rng = self.random
+
+        rows = (
+            Organization(
+                name=f'{rng.choice(words)} {rng.choice(words)}'.title(),
+                college_id=rng.choice(colleges),
+                description=rng.choice(sentences)
             )
-        
-        self.stdout.write(self.style.SUCCESS(
-            'Initial data for organization created successfully.'
-        ))
+            for _ in range(count)
+        )
+        self.insert(Organization, rows, count, 'organization')
 
     def create_students(self, count):
+        if not count:
+            return
+        programs = list(Program.objects.values_list('id', 'college_id'))
+        if not programs:
+            raise CommandError('Create colleges and programs before seeding students.')
+
         fake = Faker('en_PH')
-        
-        for _ in range(count):
-            Student.objects.create(
-                student_id=f"{fake.random_int(2020, 2024)}-{fake.random_int(1, 8)}-{fake.random_number(digits=4)}",
-                lastname=fake.last_name(),
-                firstname=fake.first_name(),
-                middlename=fake.last_name(),
-                program=Program.objects.order_by('?').first()
-            )
-        
-        self.stdout.write(self.style.SUCCESS(
-            'Initial data for students created successfully.'
-        ))
+        last_names = [fake.last_name() for _ in range(NAME_POOL_SIZE)]
+        first_names = [fake.first_name() for _ in range(NAME_POOL_SIZE)]
+        rng = self.random
+        # student_id is unique, so the serial part counts up from the
+        # existing rows instead of being drawn at random.
+        first = Student.objects.count()
+
+        def rows():
+            for serial in range(first, first + count):
+                program_id, college_id = rng.choice(programs)
+                yield Student(
+                    student_id=f"{rng.randint(2020, 2024)}-{rng.randint(1, 8)}-{serial:06d}",
+                    lastname=rng.choice(last_names),
+                    firstname=rng.choice(first_names),
+                    middlename=rng.choice(last_names),
+                    program_id=program_id,
+                    college_id=college_id
+                )
+
+        self.insert(Student, rows(), count, 'students')
 
     def create_membership(self, count):
-        fake = Faker()
-        
-        for _ in range(count):
-            OrgMember.objects.create(
-                student=Student.objects.order_by('?').first(),
-                organization=Organization.objects.order_by('?').first(),
-                date_joined=fake.date_between(start_date="-2y", end_date="today")
-            )
-        
-        self.stdout.write(self.style.SUCCESS(
-            'Initial data for student organization created successfully.'
-        ))
+        if not count:
+            return
+        students = list(Student.objects.values_list('id', flat=True))
+        organizations = list(Organization.objects.values_list('id', flat=True))
+        if not students or not organizations:
+            raise CommandError('Seeding memberships needs students and organizations.')
+
+        count = min(count, len(students) * len(organizations))
+        rng = self.random
+        today = date.today()
+
+        def rows():
+            # Pairs are packed into one int so a million of them stay cheap
+            # to keep in a set.
+            seen = set()
+            stride = max(organizations) + 1
+            while len(seen) < count:
+                student_id = rng.choice(students)
+                organization_id = rng.choice(organizations)
+                pair = student_id * stride + organization_id
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                yield OrgMember(
+                    student_id=student_id,
+                    organization_id=organization_id,
+                    date_joined=today - timedelta(days=rng.randint(0, 730))
+                )
+
+        self.insert(OrgMember, rows(), count, 'student organization')
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from studentorg import export
+
+
+class Command(BaseCommand):
+    help = 'Stream an entity to CSV or JSON lines without loading it into memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('entity', choices=sorted(export.EXPORTS))
+        parser.add_argument('--format', choices=sorted(export.FORMATS), default='csv')
+        parser.add_argument('--q', default=None, help='Same search as the list views.')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--output', default='-', help="File to write, '-' for stdout.")
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunks = export.lines(options['entity'], options['format'],
+                              query=options['q'], chunk_size=options['chunk_size'])
+        data = export.encoded(chunks, options['gzip'])
+
+        if options['output'] == '-':
+            out = sys.stdout.buffer
+            for block in data:
+                out.write(block)
+            out.flush()
+            return
+
+        with open(options['output'], 'wb') as out:
+            for block in data:
+                out.write(block)
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {options['entity']} to {options['output']}."
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from studentorg import importer
+
+
+class Command(BaseCommand):
+    help = 'Import students or organization members from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(importer.IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=importer.BATCH_SIZE)
+        parser.add_argument('--errors', help='Write rejected rows to this CSV file.')
+
+    def handle(self, *args, **options):
+        def progress(report):
+            self.stdout.write(f'{report.rows} rows processed...')
+
+        try:
+            f = open(options['path'], newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(e)
+        with f:
+            report = importer.run(options['kind'], f, options['batch_size'], progress)
+
+        if options['errors'] and report.errors:
+            with open(options['errors'], 'w', newline='') as out:
+                report.write_errors(out)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{report.created} created, {report.updated} updated, '
+            f'{len(report.errors)} rejected.'))
+        if report.errors and not options['errors']:
+            for row in report.errors[:20]:
+                self.stdout.write(f"line {row['line']}: {row['errors']}")
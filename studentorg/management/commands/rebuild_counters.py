@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from studentorg import counters, jobs
+
+
+class Command(BaseCommand):
+    help = 'Reconcile the dashboard counters with the base tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted counters without repairing them.')
+        parser.add_argument('--background', action='store_true',
+                            help='Queue the rebuild for run_worker instead of running it here.')
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = jobs.enqueue('command', {'name': 'rebuild_counters', 'options': {
+                'batch_size': options['batch_size'], 'dry_run': options['dry_run']}})
+            self.stdout.write(f'Queued as job {job.pk}.')
+            return
+
+        report = counters.rebuild(batch_size=options['batch_size'],
+                                  dry_run=options['dry_run'])
+        for counter, drifted in report.items():
+            if drifted:
+                self.stdout.write(self.style.WARNING(f'{counter}: {drifted} rows drifted'))
+
+        if options['dry_run']:
+            self.stdout.write(f'{sum(report.values())} drifted rows found.')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Dashboard counters rebuilt successfully '
+                f'({sum(report.values())} drifted rows repaired).'
+            ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from studentorg import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search indexes behind the list views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        search.install(options['database'])
+        search.rebuild(options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            'Search indexes rebuilt successfully.'
+        ))
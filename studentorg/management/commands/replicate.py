@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from studentorg import replication
+from studentorg.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database over the local read replica'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Keep replicating every INTERVAL seconds when the primary changes. '
+                                 'Run a single such process per replica.')
+
+    def handle(self, *args, **options):
+        target = replica_alias()
+        if target is None:
+            raise CommandError('No read replica configured; set DJANGO_READ_REPLICA.')
+
+        if options['interval']:
+            self.stdout.write(f'Replicating into {target} every {options["interval"]}s.')
+            replication.follow(target, options['interval'])
+        else:
+            replication.replicate(target)
+            self.stdout.write(self.style.SUCCESS(
+                f'Primary copied to {target} successfully.'
+            ))
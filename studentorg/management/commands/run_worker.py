@@ -0,0 +1,51 @@
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from studentorg import jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.JOB_WORKER_PROCESSES,
+                            help='Number of worker processes taking jobs in parallel.')
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='Seconds to wait between checks of an empty queue.')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty.')
+
+    def handle(self, *args, **options):
+        if not settings.SHARED_CACHE:
+            # A worker's cache.touch() would never reach the web processes,
+            # which would keep serving deleted rows from their own caches.
+            raise CommandError('run_worker needs a cache shared with the web processes; '
+                               'set DJANGO_CACHE_DIR.')
+
+        stale = jobs.requeue_stale()
+        if stale:
+            self.stdout.write(self.style.WARNING(f'{stale} stale jobs returned to the queue.'))
+
+        processes = max(options['processes'], 1)
+        self.stdout.write(f'Running jobs in {processes} processes.')
+        if processes == 1:
+            jobs.work(options['poll'], options['once'])
+            return
+
+        # Fork explicitly: spawned children (the default on macOS and
+        # Windows) would start without Django set up. Forked children must
+        # open their own connections.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        pool = [context.Process(target=jobs.work, args=(options['poll'], options['once']))
+                for _ in range(processes)]
+        for process in pool:
+            process.start()
+        try:
+            for process in pool:
+                process.join()
+        except KeyboardInterrupt:
+            for process in pool:
+                process.terminate()
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from studentorg import assets
+
+
+class Command(BaseCommand):
+    help = 'Download the CDN assets the templates use into static/vendor/'
+
+    def handle(self, *args, **options):
+        root = settings.BASE_DIR / 'static'
+        for name, url in assets.VENDORED.items():
+            try:
+                written = assets.vendor(name, url, root)
+            except OSError as exc:
+                raise CommandError(f'Could not download {url}: {exc}')
+            for path in written:
+                self.stdout.write(f'  {path.relative_to(settings.BASE_DIR)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            'Vendored assets downloaded successfully; run collectstatic to publish them.'
+        ))
@@ -0,0 +1,180 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+
+logger = logging.getLogger('studentorg.requests')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_NUMBER = re.compile(r'\b\d+(\.\d+)?\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+
+
+def fingerprint(sql):
+    """Collapse literals so repeated statements group together."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _IN_LIST.sub('(...)', sql)
+
+
+class QueryCollector:
+    """``execute_wrapper`` hook recording every statement a request runs."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.queries.append((context['connection'].alias, sql, duration))
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, _, duration in self.queries)
+
+    def slowest(self, limit):
+        ordered = sorted(self.queries, key=lambda query: query[2], reverse=True)
+        return [{'alias': alias, 'sql': sql[:500], 'ms': round(duration, 3)}
+                for alias, sql, duration in ordered[:limit]]
+
+    def duplicates(self):
+        counts = Counter(fingerprint(sql) for _, sql, _ in self.queries)
+        return {sql[:500]: n for sql, n in counts.most_common() if n > 1}
+
+
+class RequestProfileBuffer:
+    """Thread-safe ring buffer of the most recent request profiles."""
+
+    def __init__(self, size):
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries)
+
+
+profiles = RequestProfileBuffer(getattr(settings, 'REQUEST_PROFILE_BUFFER_SIZE', 0) or 0)
+
+
+class QueryInstrumentationMiddleware:
+    """Measure the SQL cost of every request.
+
+    Adds a ``Server-Timing`` header, logs one JSON line to the
+    ``studentorg.requests`` logger (at WARNING past
+    ``REQUEST_PROFILE_SLOW_MS``) and, when ``REQUEST_PROFILE_BUFFER_SIZE``
+    is set, keeps recent profiles for the staff-only profile endpoint.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slowest = getattr(settings, 'REQUEST_PROFILE_SLOWEST', 3)
+        self.slow_ms = getattr(settings, 'REQUEST_PROFILE_SLOW_MS', 500)
+        self.buffer_enabled = bool(getattr(settings, 'REQUEST_PROFILE_BUFFER_SIZE', 0))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        collector = QueryCollector()
+        started = time.perf_counter()
+        with self.instrument(collector):
+            response = self.get_response(request)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.record(request, response, collector, elapsed)
+        return response
+
+    async def __acall__(self, request):
+        collector = QueryCollector()
+        started = time.perf_counter()
+        # Under ASGI the async ORM runs every query of this request on one
+        # thread-sensitive worker thread, whose connections are not the
+        # event loop's; install and remove the wrappers on that thread.
+        stack = await sync_to_async(self.instrument)(collector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.record(request, response, collector, elapsed)
+        return response
+
+    def instrument(self, collector):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(collector))
+        return stack
+
+    def record(self, request, response, collector, elapsed):
+        sql_ms = collector.total_ms
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={sql_ms:.2f};desc="{len(collector.queries)} queries"',
+            f'app;dur={elapsed - sql_ms:.2f}',
+            f'total;dur={elapsed:.2f}',
+        ])
+
+        entry = {
+            'time': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'view': getattr(request.resolver_match, 'view_name', None),
+            'status': response.status_code,
+            'duration_ms': round(elapsed, 3),
+            'queries': len(collector.queries),
+            'sql_ms': round(sql_ms, 3),
+            'slowest': collector.slowest(self.slowest),
+            'duplicates': collector.duplicates(),
+        }
+        level = logging.WARNING if elapsed >= self.slow_ms else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps(entry))
+        if self.buffer_enabled:
+            profiles.append(entry)
+
+
+class ReadReplicaMiddleware(MiddlewareMixin):
+    """Pin requests to the primary database for read-your-writes.
+
+    Writes set a short-lived cookie; while it lasts, and for the write
+    itself, ``request.pin_primary`` tells ``replica_reads`` views to stay on
+    the primary.
+    """
+    cookie_name = 'read_primary'
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sticky_seconds = getattr(settings, 'READ_REPLICA_STICKY_SECONDS', 5)
+
+    def process_request(self, request):
+        request.pin_primary = (request.method not in SAFE_METHODS
+                               or self.cookie_name in request.COOKIES)
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and self.sticky_seconds:
+            response.set_cookie(self.cookie_name, '1', max_age=self.sticky_seconds,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,198 @@
+# Squashes 0005-0011, which created the CollegeStats, ProgramStats and
+# OrganizationStats summary tables only for 0011 to replace them with the
+# counter columns. Databases that already ran them are left alone.
+
+import studentorg.models
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_join_period(apps, schema_editor):
+    OrgMember = apps.get_model('studentorg', 'OrgMember')
+    dates = OrgMember.objects.values_list('date_joined', flat=True).distinct()
+    for date_joined in list(dates):
+        OrgMember.objects.filter(date_joined=date_joined).update(
+            join_year=date_joined.year,
+            join_month=date_joined.month,
+            join_term=1 if date_joined.month <= 6 else 2)
+
+
+def deduplicate(apps, schema_editor):
+    Student = apps.get_model('studentorg', 'Student')
+    OrgMember = apps.get_model('studentorg', 'OrgMember')
+
+    # Students sharing a student_id keep the oldest record as is; the others
+    # get their primary key appended so nothing is lost and the rows can be
+    # corrected by hand.
+    duplicated = (Student.objects.values('student_id')
+                  .annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1))
+    for row in list(duplicated):
+        extras = Student.objects.filter(student_id=row['student_id']).exclude(id=row['keep'])
+        for student in extras:
+            suffix = f'#{student.id}'
+            student.student_id = student.student_id[:15 - len(suffix)] + suffix
+            student.save(update_fields=['student_id'])
+
+    # Repeated memberships are true duplicates: keep the oldest. The
+    # counters are computed afterwards, so they never count the rest.
+    duplicated = (OrgMember.objects.values('student_id', 'organization_id')
+                  .annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1))
+    for row in list(duplicated):
+        (OrgMember.objects
+         .filter(student_id=row['student_id'], organization_id=row['organization_id'])
+         .exclude(id=row['keep'])
+         .delete())
+
+
+def _count(model, key):
+    counted = (model.objects.filter(**{key: OuterRef('pk')}).order_by()
+               .values(key).annotate(n=Count('pk')).values('n'))
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def populate_counters(apps, schema_editor):
+    College = apps.get_model('studentorg', 'College')
+    Program = apps.get_model('studentorg', 'Program')
+    Organization = apps.get_model('studentorg', 'Organization')
+    Student = apps.get_model('studentorg', 'Student')
+    OrgMember = apps.get_model('studentorg', 'OrgMember')
+    SemesterStats = apps.get_model('studentorg', 'SemesterStats')
+
+    College.objects.update(organization_count=_count(Organization, 'college'),
+                           program_count=_count(Program, 'college'))
+    Program.objects.update(student_count=_count(Student, 'program'),
+                           member_count=_count(OrgMember, 'student__program'))
+    Organization.objects.update(member_count=_count(OrgMember, 'organization'))
+
+    semesters = OrgMember.objects.values('join_year', 'join_term').annotate(n=Count('id'))
+    SemesterStats.objects.bulk_create(
+        SemesterStats(year=row['join_year'], term=row['join_term'], member_count=row['n'])
+        for row in semesters)
+
+
+def create_search_indexes(apps, schema_editor):
+    from studentorg import search
+    search.install(schema_editor.connection.alias)
+
+
+def drop_search_indexes(apps, schema_editor):
+    from studentorg import search
+    search.uninstall(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('studentorg', '0005_dashboard_counters'),
+        ('studentorg', '0006_search_index'),
+        ('studentorg', '0007_orgmember_join_period'),
+        ('studentorg', '0008_deduplicate_students_and_members'),
+        ('studentorg', '0009_unique_student_and_membership'),
+        ('studentorg', '0010_name_and_membership_indexes'),
+        ('studentorg', '0011_counter_columns'),
+    ]
+
+    dependencies = [
+        ('studentorg', '0004_alter_student_lastname'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemesterStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('term', models.PositiveSmallIntegerField(choices=[(1, 'Spring'), (2, 'Fall')])),
+                ('member_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('year', 'term'), name='unique_semester_bucket')],
+            },
+        ),
+        migrations.AddField(
+            model_name='orgmember',
+            name='join_month',
+            field=studentorg.models.JoinPeriodField(part='month', source='date_joined'),
+        ),
+        migrations.AddField(
+            model_name='orgmember',
+            name='join_term',
+            field=studentorg.models.JoinPeriodField(part='term', source='date_joined'),
+        ),
+        migrations.AddField(
+            model_name='orgmember',
+            name='join_year',
+            field=studentorg.models.JoinPeriodField(part='year', source='date_joined'),
+        ),
+        migrations.RunPython(backfill_join_period, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='orgmember',
+            index=models.Index(fields=['join_year', 'join_month', 'join_term', 'date_joined'], name='orgmember_join_period_idx'),
+        ),
+        migrations.RunPython(deduplicate, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='student',
+            name='student_id',
+            field=models.CharField(max_length=15, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name='orgmember',
+            constraint=models.UniqueConstraint(fields=('student', 'organization'), name='unique_membership'),
+        ),
+        migrations.AlterField(
+            model_name='college',
+            name='college_name',
+            field=models.CharField(db_index=True, max_length=150),
+        ),
+        migrations.AlterField(
+            model_name='organization',
+            name='name',
+            field=models.CharField(db_index=True, max_length=250),
+        ),
+        migrations.AlterField(
+            model_name='program',
+            name='prog_name',
+            field=models.CharField(db_index=True, max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='orgmember',
+            index=models.Index(fields=['organization', 'student'], name='orgmember_org_student_idx'),
+        ),
+        migrations.AddField(
+            model_name='college',
+            name='organization_count',
+            field=studentorg.models.CounterField(),
+        ),
+        migrations.AddField(
+            model_name='college',
+            name='program_count',
+            field=studentorg.models.CounterField(),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='member_count',
+            field=studentorg.models.CounterField(),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='member_count',
+            field=studentorg.models.CounterField(),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='student_count',
+            field=studentorg.models.CounterField(),
+        ),
+        migrations.AddIndex(
+            model_name='organization',
+            index=models.Index(fields=['-member_count', 'name'], name='organization_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['-student_count', 'prog_name'], name='program_popularity_idx'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+        # Last, as the table rebuilds above drop SQLite's triggers.
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
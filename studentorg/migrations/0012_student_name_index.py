@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studentorg', '0005_dashboard_counters_squashed_0011_counter_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['lastname', 'firstname'], name='student_name_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studentorg', '0013_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='firstname',
+            field=models.CharField(max_length=25, verbose_name='First Name'),
+        ),
+    ]
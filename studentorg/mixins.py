@@ -0,0 +1,146 @@
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.contrib import messages
+from django.http import Http404, HttpResponseRedirect
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.utils.translation import gettext as _
+from django.views.generic.base import ContextMixin
+
+from studentorg import cache, deletion, jobs
+from studentorg.routers import replica_reads
+
+
+class RelatedObjectsMixin:
+    """Apply a view's relation-loading plan to every queryset it builds.
+
+    List views name the relations their templates render in
+    ``select_related`` / ``prefetch_related`` so a page costs the same
+    number of queries whatever its size.
+    """
+    select_related = ()
+    prefetch_related = ()
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.select_related:
+            qs = qs.select_related(*self.select_related)
+        if self.prefetch_related:
+            qs = qs.prefetch_related(*self.prefetch_related)
+        return qs
+
+
+class ReplicaReadMixin:
+    """Serve the view's reads from the read replica, if one is configured.
+
+    Reads stay on the primary for a moment after a write to the models the
+    view caches (``fragment_models``, or its model).
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        models = getattr(cls, 'fragment_models', None) or (cls.model,)
+        return replica_reads(super().as_view(**initkwargs), models=models)
+
+
+class FragmentCacheMixin:
+    """Key the template's ``{% cache %}`` fragments on ``view.fragment_key``.
+
+    The key combines the write generations of ``fragment_models``, every
+    model whose data the fragment shows, with the query string (page or
+    cursor, ``q``, ``sort``), so a cached table is re-rendered after any
+    write that could change it.
+    """
+    fragment_models = ()
+
+    def fragment_key(self):
+        return f'{cache.version(*self.fragment_models)}:{self.request.GET.urlencode()}'
+
+
+class BulkDeleteMixin:
+    """DeleteView for models with large cascades.
+
+    The confirmation page lists what the delete takes with it as
+    ``cascade``. The delete itself is queued as a background job running
+    chunked set-based SQL (studentorg.deletion) instead of loading every
+    dependent row through Django's collector; the user is sent to the job's
+    progress page.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cascade'] = deletion.preview(self.object)
+        return context
+
+    def form_valid(self, form):
+        job = jobs.enqueue('delete', {'model': self.model._meta.label, 'pk': self.object.pk})
+        if job.status == job.DONE:
+            messages.success(self.request, 'Successfully deleted.')
+            return HttpResponseRedirect(self.get_success_url())
+        messages.success(self.request, f'{self.object} is being deleted.')
+        url = reverse('job-detail', args=[job.pk])
+        return HttpResponseRedirect(f'{url}?{urlencode({"next": self.get_success_url()})}')
+
+
+class AsyncListMixin:
+    """Serve a ListView through the async ORM.
+
+    The page, and the COUNT behind numbered pages, are fetched with
+    ``acount()`` and async iteration before the template renders, so under
+    ASGI the view never runs a query from the event loop's thread. Put it
+    after CursorPaginationMixin in the bases so cursor pages are fetched
+    the same way.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        # Building the queryset may itself query (search index detection),
+        # so it runs on the sync side.
+        queryset = await sync_to_async(self.get_queryset)()
+        page_size = self.get_paginate_by(queryset)
+        context = {'paginator': None, 'page_obj': None, 'is_paginated': False}
+        if page_size:
+            paginator, page, object_list, is_paginated = await self.apaginate_queryset(
+                queryset, page_size)
+            context = {'paginator': paginator, 'page_obj': page, 'is_paginated': is_paginated}
+        else:
+            object_list = [obj async for obj in queryset]
+
+        self.object_list = object_list
+        context['object_list'] = object_list
+        name = self.get_context_object_name(queryset)
+        if name is not None:
+            context[name] = object_list
+        # MultipleObjectMixin.get_context_data would paginate again.
+        context = ContextMixin.get_context_data(self, **context)
+        return self.render_to_response(context)
+
+    async def apaginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(
+            queryset, page_size, orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty())
+        # Paginator.count is a cached_property; filling it here keeps the
+        # paginator from running the COUNT itself. CachedCountPaginator
+        # brings its own cached acount(), and apage() for lists too long to
+        # count.
+        acount = getattr(paginator, 'acount', queryset.acount)
+        paginator.count = await acount()
+
+        page_kwarg = self.page_kwarg
+        page = self.kwargs.get(page_kwarg) or self.request.GET.get(page_kwarg) or 1
+        try:
+            page_number = int(page)
+        except ValueError:
+            if page != 'last':
+                raise Http404(_('Page is not “last”, nor can it be converted to an int.'))
+            page_number = paginator.num_pages
+        try:
+            if hasattr(paginator, 'apage'):
+                page = await paginator.apage(page_number)
+            else:
+                page = paginator.page(page_number)
+                page.object_list = [obj async for obj in page.object_list]
+        except InvalidPage as e:
+            raise Http404(_('Invalid page (%(page_number)s): %(message)s') % {
+                'page_number': page_number, 'message': str(e)})
+
+        return (paginator, page, page.object_list, page.has_other_pages())
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class BaseModel(models.Model):
@@ -9,47 +10,208 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class CounterField(models.IntegerField):
+    """Denormalized count maintained by the receivers in studentorg/signals.py.
+
+    Saving an existing row writes the column back as itself, so a stale
+    value loaded before a concurrent increment is never written over it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('default', 0)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop('editable', None)
+        if kwargs.get('default') == 0:
+            del kwargs['default']
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return models.F(self.attname)
+
+
 class College(BaseModel):
-    college_name = models.CharField(max_length=150)
+    college_name = models.CharField(max_length=150, db_index=True)
+    organization_count = CounterField()
+    program_count = CounterField()
 
     def __str__(self):
         return self.college_name
 
 
 class Program(BaseModel):
-    prog_name = models.CharField(max_length=150)
+    prog_name = models.CharField(max_length=150, db_index=True)
     college = models.ForeignKey(College, on_delete=models.CASCADE)
+    student_count = CounterField()
+    member_count = CounterField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-student_count', 'prog_name'], name='program_popularity_idx'),
+        ]
 
     def __str__(self):
         return self.prog_name
 
 
 class Organization(BaseModel):
-    name = models.CharField(max_length=250)
+    name = models.CharField(max_length=250, db_index=True)
     college = models.ForeignKey(
         College, null=True, blank=True, on_delete=models.CASCADE)
     description = models.CharField(max_length=500)
+    member_count = CounterField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-member_count', 'name'], name='organization_popularity_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
 class Student(BaseModel):
-    student_id = models.CharField(max_length=15)
+    student_id = models.CharField(max_length=15, unique=True)
     lastname = models.CharField(max_length=25, verbose_name="Last Name")
     firstname = models.CharField(max_length=25, verbose_name="First Name")
     middlename = models.CharField(max_length=25, blank=True, null=True)
     program = models.ForeignKey(Program, on_delete=models.CASCADE)
     college = models.ForeignKey(College, on_delete=models.CASCADE, default=1)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['lastname', 'firstname'], name='student_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.lastname}, {self.firstname}"
 
 
+class JoinPeriodField(models.PositiveSmallIntegerField):
+    """Year, month or term (1 = Spring, 2 = Fall) of ``date_joined``.
+
+    The value is derived in pre_save, which bulk_create calls as well, so
+    the column never needs to be set by hand.
+    """
+
+    def __init__(self, *args, part='year', source='date_joined', **kwargs):
+        self.part = part
+        self.source = source
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('null', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['part'] = self.part
+        kwargs['source'] = self.source
+        kwargs.pop('editable', None)
+        kwargs.pop('null', None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        field = model_instance._meta.get_field(self.source)
+        value = field.to_python(getattr(model_instance, field.attname))
+        if value is None:
+            period = None
+        elif self.part == 'year':
+            period = value.year
+        elif self.part == 'month':
+            period = value.month
+        else:
+            period = 1 if value.month <= 6 else 2
+        setattr(model_instance, self.attname, period)
+        return period
+
+
 class OrgMember(BaseModel):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
     date_joined = models.DateField()
+    join_year = JoinPeriodField(part='year')
+    join_month = JoinPeriodField(part='month')
+    join_term = JoinPeriodField(part='term')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'organization'], name='unique_membership'),
+        ]
+        indexes = [
+            # Covers the grouped trend reads at every granularity, including
+            # date-range filters, without touching the table.
+            models.Index(
+                fields=['join_year', 'join_month', 'join_term', 'date_joined'],
+                name='orgmember_join_period_idx'),
+            # unique_membership indexes (student, organization); this is the
+            # same pair led by organization, for per-organization lookups.
+            models.Index(
+                fields=['organization', 'student'], name='orgmember_org_student_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.firstname} {self.student.lastname} - {self.organization.name}"
+
+
+# Per-semester membership totals behind the trend chart. Like the counter
+# columns above they are maintained by studentorg/signals.py and can be
+# rebuilt with `manage.py rebuild_counters`.
+
+
+class SemesterStats(models.Model):
+    SPRING = 1
+    FALL = 2
+    TERM_CHOICES = [(SPRING, 'Spring'), (FALL, 'Fall')]
+
+    year = models.PositiveSmallIntegerField()
+    term = models.PositiveSmallIntegerField(choices=TERM_CHOICES)
+    member_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['year', 'term'], name='unique_semester_bucket'),
+        ]
+
+    @staticmethod
+    def term_for(date):
+        return SemesterStats.SPRING if date.month <= 6 else SemesterStats.FALL
+
+
+# Background work picked up by `manage.py run_worker`; see studentorg/jobs.py.
+
+
+class Job(BaseModel):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=50)
+    args = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's claim query: oldest due job still queued.
+            models.Index(fields=['status', 'run_after'], name='job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,274 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from django.core.cache import cache as default_cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from studentorg import cache
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj, direction):
+    payload = json.dumps([obj.created_at.isoformat(), obj.pk, direction])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, pk, direction = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(pk), direction
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(token) from e
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor(self.object_list[-1], 'next')
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor(self.object_list[0], 'prev')
+
+
+class CursorPaginator:
+    """Keyset paginator over ``(created_at, id)``, newest first.
+
+    Each page is a range read on the created_at index that starts where the
+    previous page ended, so it costs the same at any depth and needs no
+    COUNT(*).
+    """
+    ordering = ('-created_at', '-id')
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    def _plan(self, token):
+        """The query for the page at ``token`` and a function turning its
+        rows into a CursorPage."""
+        qs = self.queryset
+        if not token:
+            return (qs.order_by(*self.ordering)[:self.per_page + 1],
+                    lambda rows: CursorPage(rows[:self.per_page], len(rows) > self.per_page, False))
+
+        created_at, pk, direction = decode_cursor(token)
+        if direction == 'next':
+            return (qs.filter(created_at__lte=created_at)
+                    .exclude(created_at=created_at, id__gte=pk)
+                    .order_by(*self.ordering)[:self.per_page + 1],
+                    lambda rows: CursorPage(rows[:self.per_page], len(rows) > self.per_page, True))
+        if direction == 'prev':
+            return (qs.filter(created_at__gte=created_at)
+                    .exclude(created_at=created_at, id__lte=pk)
+                    .order_by('created_at', 'id')[:self.per_page + 1],
+                    lambda rows: CursorPage(rows[:self.per_page][::-1], True, len(rows) > self.per_page))
+        raise InvalidCursor(token)
+
+    def page(self, token=None):
+        qs, make_page = self._plan(token)
+        return make_page(list(qs))
+
+    async def apage(self, token=None):
+        qs, make_page = self._plan(token)
+        return make_page([obj async for obj in qs])
+
+
+class CursorPaginationMixin:
+    """Opt-in keyset pagination for ListViews.
+
+    Only views whose ordering is the cursor's own, ``('-created_at',
+    '-id')``, can be paginated by cursor; they switch to it when a
+    ``cursor`` parameter is present in the query string, or by default if
+    they set ``cursor_pagination = True``. Any other ordering, and searches,
+    which are ordered by rank, keep numbered pages.
+    """
+    cursor_pagination = False
+    cursor_param = 'cursor'
+    search_param = 'q'
+
+    def uses_cursor_pagination(self):
+        if self.request.GET.get(self.search_param):
+            return False
+        if tuple(self.get_ordering() or ()) != CursorPaginator.ordering:
+            return False
+        return self.cursor_pagination or self.cursor_param in self.request.GET
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_param))
+        except InvalidCursor:
+            raise Http404('Invalid cursor.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        if not self.uses_cursor_pagination():
+            return await super().apaginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = await paginator.apage(self.request.GET.get(self.cursor_param))
+        except InvalidCursor:
+            raise Http404('Invalid cursor.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class CachedCountPaginator(Paginator):
+    """Numbered paginator whose COUNT(*) is cached across requests.
+
+    The count is keyed on the queryset's SQL and parameters, with ordering
+    stripped, and on the write generations of ``models``. Paging through
+    the same filtered list, or a search, counts it once until one of those
+    models is written.
+
+    With ``count_limit``, counting stops after that many rows. A longer
+    list reports ``many`` and a count of ``count_limit + 1``; its pages are
+    then read one row past the end to find out whether there is a next
+    one, so Next keeps working beyond the limit while the total and the
+    last page stay unknown.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 models=(), count_limit=None, timeout=300):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.models = models or (object_list.model,)
+        self.count_limit = count_limit
+        self.timeout = timeout
+
+    def _count_query(self):
+        qs = self.object_list.order_by()
+        if self.count_limit is not None:
+            qs = qs[:self.count_limit + 1]
+        return qs
+
+    def _count_key(self):
+        sql, params = self._count_query().query.sql_with_params()
+        digest = hashlib.md5(f'{sql}:{params!r}'.encode()).hexdigest()
+        return f'{cache.KEY_PREFIX}:count:{cache.version(*self.models)}:{digest}'
+
+    @cached_property
+    def count(self):
+        key = self._count_key()
+        value = default_cache.get(key)
+        if value is None:
+            value = self._count_query().count()
+            default_cache.set(key, value, self.timeout)
+        return value
+
+    async def acount(self):
+        key = self._count_key()
+        value = await default_cache.aget(key)
+        if value is None:
+            value = await self._count_query().acount()
+            await default_cache.aset(key, value, self.timeout)
+        return value
+
+    @property
+    def many(self):
+        return self.count_limit is not None and self.count > self.count_limit
+
+    def validate_number(self, number):
+        if not self.many:
+            return super().validate_number(number)
+        # Past the count the last page is unknown; page() finds out
+        # whether ``number`` still has rows.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().validate_number(number)
+        if number < 1:
+            return super().validate_number(number)
+        return number
+
+    def _probe(self, number):
+        bottom = (number - 1) * self.per_page
+        return self.object_list[bottom:bottom + self.per_page + 1]
+
+    def _probed_page(self, rows, number):
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return ProbedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+    def page(self, number):
+        if not self.many:
+            return super().page(number)
+        number = self.validate_number(number)
+        return self._probed_page(list(self._probe(number)), number)
+
+    async def apage(self, number):
+        """page() with its rows fetched through the async ORM."""
+        if not self.many:
+            page = super().page(number)
+            page.object_list = [obj async for obj in page.object_list]
+            return page
+        number = self.validate_number(number)
+        return self._probed_page([obj async for obj in self._probe(number)], number)
+
+
+class ProbedPage(Page):
+    """A page of a list too long to count, which knows whether it has a
+    next page from the extra row it was read with."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def end_index(self):
+        return self.start_index() + len(self) - 1
+
+
+class CachedCountMixin:
+    """Paginate a ListView with CachedCountPaginator.
+
+    The count is invalidated by writes to ``count_models``. That defaults
+    to the view's ``fragment_models``, which already name every model a
+    list's filters can join, and otherwise to the listed model.
+    """
+    paginator_class = CachedCountPaginator
+    count_models = None
+    count_limit = None
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        models = self.count_models or getattr(self, 'fragment_models', None) or (queryset.model,)
+        return self.paginator_class(
+            queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+            models=models, count_limit=self.count_limit, **kwargs)
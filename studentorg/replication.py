@@ -0,0 +1,59 @@
+import logging
+import sqlite3
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from studentorg.routers import replica_alias
+
+logger = logging.getLogger('studentorg.replication')
+
+
+# Local stand-in for a streaming replica: the primary SQLite file is copied
+# over the replica file with SQLite's online backup API whenever it has
+# changed, by one `manage.py replicate --interval N` process. Real
+# deployments point the replica alias at an actual replica instead.
+#
+# A copy doesn't touch any cache generation: views that cache replica
+# reads go to the primary for READ_REPLICA_MAX_LAG seconds after a write
+# (studentorg.routers.recently_written), so keep the interval below it.
+
+
+def _path(alias):
+    return str(connections[alias].settings_dict['NAME'])
+
+
+def copy(source, target):
+    """Copy the ``source`` connection's database over ``target``'s file."""
+    destination = sqlite3.connect(_path(target), timeout=30)
+    try:
+        source.backup(destination)
+    finally:
+        destination.close()
+
+
+def replicate(target=None):
+    """Copy the primary over the replica once."""
+    target = target or replica_alias()
+    source = sqlite3.connect(_path(DEFAULT_DB_ALIAS), timeout=30)
+    try:
+        copy(source, target)
+    finally:
+        source.close()
+
+
+def follow(target, interval):
+    """Replicate the primary every ``interval`` seconds when it has changed,
+    forever. ``PRAGMA data_version`` moves whenever another connection
+    commits, so an idle primary costs one pragma per tick."""
+    source = sqlite3.connect(_path(DEFAULT_DB_ALIAS), timeout=30)
+    seen = None
+    while True:
+        try:
+            version = source.execute('PRAGMA data_version').fetchone()[0]
+            if version != seen:
+                copy(source, target)
+                seen = version
+        except sqlite3.Error:
+            logger.exception('Replicating %s failed', target)
+        time.sleep(interval)
@@ -0,0 +1,100 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial, wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from studentorg import cache
+
+
+# Reads go to the replica only inside views that opt in with
+# ``replica_reads`` (the chart endpoints and list views). Everything else,
+# including form handling, management commands and signal receivers,
+# reads and writes the primary.
+_use_replica = ContextVar('studentorg_use_replica', default=False)
+
+
+def replica_alias():
+    alias = getattr(settings, 'READ_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def reading_from_replica(enabled=True):
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def recently_written(models):
+    """Whether any of ``models`` was written within READ_REPLICA_MAX_LAG
+    seconds, so the replica may not have the write yet."""
+    if not models:
+        return False
+    lag = getattr(settings, 'READ_REPLICA_MAX_LAG', 5)
+    return time.time() - max(cache.last_modified(model) for model in models) < lag
+
+
+def replica_reads(view=None, *, models=()):
+    """Serve ``view``'s reads from the read replica.
+
+    Requests pinned to the primary by ReadReplicaMiddleware (writes, and
+    reads shortly after one) keep reading the primary so users see their
+    own changes. Views that cache what they read name the ``models`` it
+    comes from: right after one is written its generation has moved on but
+    the replica may still lag, so those reads go to the primary until the
+    replica has caught up, rather than cache old rows under the new
+    generation. Use as ``@replica_reads`` or
+    ``@replica_reads(models=...)``.
+    """
+    if view is None:
+        return partial(replica_reads, models=models)
+
+    def use_replica(request):
+        if getattr(request, 'pin_primary', False) or replica_alias() is None:
+            return False
+        return not recently_written(models)
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            with reading_from_replica(use_replica(request)):
+                return await view(request, *args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with reading_from_replica(use_replica(request)):
+                return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias is None or not _use_replica.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads inside a transaction must see its writes.
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Objects loaded from the replica are saved to the primary too.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary.
+        if db == replica_alias():
+            return False
+        return None
@@ -0,0 +1,180 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from studentorg.models import College, Program, Organization, Student, OrgMember
+
+
+# Fields searched by the `q` box of each list view. On SQLite the first four
+# models are backed by FTS5 tables that use the model table as external
+# content and are kept in sync by triggers, so bulk inserts and raw deletes
+# stay searchable too. Any other backend falls back to icontains lookups.
+SEARCH_FIELDS = {
+    Student: ['firstname', 'lastname', 'middlename', 'student_id'],
+    Organization: ['name', 'description'],
+    College: ['college_name'],
+    Program: ['prog_name'],
+    OrgMember: ['student__firstname', 'student__lastname', 'organization__name'],
+}
+
+FTS_MODELS = (Student, Organization, College, Program)
+
+# Memberships are matched through the student and organization indexes.
+RELATED_SEARCH = {
+    OrgMember: [
+        ('student_id', Student, ['firstname', 'lastname']),
+        ('organization_id', Organization, ['name']),
+    ],
+}
+
+_fts_tables = {}
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def fts_available(using='default'):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    if using not in _fts_tables:
+        tables = set(connection.introspection.table_names())
+        _fts_tables[using] = all(fts_table(model) in tables for model in FTS_MODELS)
+    return _fts_tables[using]
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query.
+
+    Every whitespace-separated term must match, and the last word of each
+    term is a prefix, so "dela cru" finds "Dela Cruz" and "2021-3" finds
+    student ids starting with it.
+    """
+    phrases = []
+    for term in query.split():
+        words = re.findall(r'\w+', term)
+        if words:
+            phrases.append('"%s"*' % ' '.join(words))
+    return ' AND '.join(phrases) or None
+
+
+def _fallback(queryset, query):
+    condition = Q()
+    for field in SEARCH_FIELDS[queryset.model]:
+        condition |= Q(**{f'{field}__icontains': query})
+    return queryset.filter(condition)
+
+
+def _match_ids(model, columns, expression):
+    table = fts_table(model)
+    return RawSQL(
+        f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+        ['{%s} : (%s)' % (' '.join(columns), expression)],
+    )
+
+
+def search(queryset, query):
+    """Filter ``queryset`` by the list-view search box, best matches first."""
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    model = queryset.model
+    expression = match_expression(query)
+    if expression is None or not fts_available(queryset.db):
+        return _fallback(queryset, query)
+
+    if model in RELATED_SEARCH:
+        condition = Q()
+        for field, related, columns in RELATED_SEARCH[model]:
+            condition |= Q(**{f'{field}__in': _match_ids(related, columns, expression)})
+        return queryset.filter(condition)
+
+    # Rank each match with a lookup by rowid, which FTS5 answers from the
+    # index; ties keep the id order so pages are stable.
+    table = fts_table(model)
+    rank = RawSQL(
+        f'SELECT rank FROM {table} WHERE {table} MATCH %s AND rowid = {model._meta.db_table}.id',
+        [expression],
+    )
+    return (queryset.filter(pk__in=_match_ids(model, SEARCH_FIELDS[model], expression))
+            .annotate(search_rank=rank)
+            .order_by('search_rank', 'id'))
+
+
+def install(using='default'):
+    """Create missing FTS tables and triggers.
+
+    SQLite drops a table's triggers whenever a migration rebuilds the table,
+    so this runs after every migrate and rebuilds any index whose triggers
+    had to be recreated. Triggers whose definition changed since they were
+    created are replaced.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = dict(cursor.fetchall())
+        for model in FTS_MODELS:
+            table = model._meta.db_table
+            fts = fts_table(model)
+            columns = SEARCH_FIELDS[model]
+            cols = ', '.join(columns)
+            new = ', '.join(f'new.{c}' for c in columns)
+            old = ', '.join(f'old.{c}' for c in columns)
+            statements = {
+                fts: (
+                    f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', "
+                    f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"),
+                f'{fts}_ai': (
+                    f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                    f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END"),
+                f'{fts}_ad': (
+                    f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                    f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END"),
+                # Only edits to the indexed columns touch the index; counter
+                # bumps and updated_at leave it alone.
+                f'{fts}_au': (
+                    f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+                    f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                    f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END"),
+            }
+            missing = [sql for name, sql in statements.items() if name not in existing]
+            for name, sql in statements.items():
+                if name.startswith(f'{fts}_') and name in existing and existing[name] != sql:
+                    cursor.execute(f'DROP TRIGGER {name}')
+                    cursor.execute(sql)
+            for sql in missing:
+                cursor.execute(sql)
+            if missing:
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    _fts_tables.pop(using, None)
+
+
+def uninstall(using='default'):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        for model in FTS_MODELS:
+            fts = fts_table(model)
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+    _fts_tables.pop(using, None)
+
+
+def rebuild(using='default'):
+    """Repopulate every FTS index from its content table."""
+    if not fts_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        for model in FTS_MODELS:
+            table = fts_table(model)
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES('rebuild')")
@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, post_migrate
+from django.dispatch import receiver
+
+from studentorg import auth, cache, search
+from studentorg.counters import bump, semester_bucket
+from studentorg.models import College, Program, Organization, Student, OrgMember, SemesterStats
+
+
+# Each tracked model describes which counter rows one instance contributes
+# to. Creates add those contributions, deletes remove them and updates move
+# them when the relevant foreign keys or dates change.
+
+
+def _program_of(student_id):
+    return (Student.objects.filter(pk=student_id)
+            .values_list('program_id', flat=True).first())
+
+
+def _member_state(instance):
+    date_joined = OrgMember._meta.get_field('date_joined').to_python(instance.date_joined)
+    return {
+        'organization_id': instance.organization_id,
+        'program_id': _program_of(instance.student_id),
+        'date_joined': date_joined,
+    }
+
+
+def _contributions(instance, state):
+    if isinstance(instance, Program):
+        return [(College, {'pk': state['college_id']}, 'program_count')]
+    if isinstance(instance, Organization):
+        if state['college_id'] is None:
+            return []
+        return [(College, {'pk': state['college_id']}, 'organization_count')]
+    if isinstance(instance, Student):
+        return [(Program, {'pk': state['program_id']}, 'student_count')]
+    if isinstance(instance, OrgMember):
+        rows = [
+            (Organization, {'pk': state['organization_id']}, 'member_count'),
+            (SemesterStats, semester_bucket(state['date_joined']), 'member_count'),
+        ]
+        if state['program_id'] is not None:
+            rows.append((Program, {'pk': state['program_id']}, 'member_count'))
+        return rows
+    return []
+
+
+def _state(instance):
+    if isinstance(instance, (Program, Organization)):
+        return {'college_id': instance.college_id}
+    if isinstance(instance, Student):
+        return {'program_id': instance.program_id}
+    if isinstance(instance, OrgMember):
+        return _member_state(instance)
+    return {}
+
+
+def _apply(instance, state, sign):
+    for model, lookup, field in _contributions(instance, state):
+        # Semester buckets are the only counter rows without a parent row.
+        bump(model, lookup, create=model is SemesterStats, **{field: sign})
+
+
+TRACKED = (College, Program, Organization, Student, OrgMember)
+
+
+@receiver(pre_save)
+def remember_counter_state(sender, instance, raw=False, **kwargs):
+    if sender not in TRACKED or raw or instance._state.adding:
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    instance._counter_state = _state(previous) if previous else None
+
+
+@receiver(post_save)
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if sender not in TRACKED or raw:
+        return
+
+    if created:
+        _apply(instance, _state(instance), 1)
+        return
+
+    old = getattr(instance, '_counter_state', None)
+    new = _state(instance)
+    if old is None or old == new:
+        return
+    _apply(instance, old, -1)
+    _apply(instance, new, 1)
+
+    if sender is Student:
+        # Memberships follow the student to the new program.
+        memberships = OrgMember.objects.filter(student=instance).count()
+        bump(Program, {'pk': old['program_id']}, member_count=-memberships)
+        bump(Program, {'pk': new['program_id']}, member_count=memberships)
+
+
+@receiver(post_delete)
+def update_counters_on_delete(sender, instance, **kwargs):
+    if sender not in TRACKED:
+        return
+    _apply(instance, _state(instance), -1)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_data(sender, raw=False, **kwargs):
+    if sender in TRACKED and not raw:
+        # Bump after commit so a concurrent reader cannot cache rows from
+        # before the write under the new generation.
+        transaction.on_commit(lambda: cache.touch(sender))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_cached_user(sender, instance, **kwargs):
+    auth.forget(instance.pk)
+
+
+@receiver(post_migrate)
+def install_search_indexes(sender, using='default', **kwargs):
+    if sender.name == 'studentorg':
+        search.install(using)
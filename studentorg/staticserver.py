@@ -0,0 +1,172 @@
+import asyncio
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.utils.http import parse_etags
+
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+
+# Preferred first.
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+CHUNK_SIZE = 64 * 1024
+
+# Written by collectstatic for the storage's own use, never served.
+MANIFEST = 'staticfiles.json'
+
+
+def accepted_encodings(header):
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    qualities = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches ``etag``, using the weak
+    comparison the header calls for: ``W/`` prefixes are ignored and ``*``
+    matches anything."""
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in {tag.removeprefix('W/') for tag in etags}
+
+
+class StaticFiles:
+    """WSGI middleware serving collectstatic's output ahead of Django
+    (AsgiStaticFiles below for ASGI).
+
+    Files are indexed once at startup. Fingerprinted names from the
+    manifest are sent with a one-year immutable Cache-Control, and the .br
+    or .gz variant written by studentorg.storage is sent instead of the
+    file when the client accepts it. Anything else falls through to the
+    wrapped application.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = str(root or settings.STATIC_ROOT or '')
+        self.prefix = '/' + (prefix or settings.STATIC_URL).strip('/') + '/'
+        self.files = self.index() if self.root and os.path.isdir(self.root) else {}
+
+    def index(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as f:
+                hashed = set(json.load(f).get('paths', {}).values())
+        except (OSError, ValueError):
+            hashed = set()
+
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for filename in names:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                if name == MANIFEST or name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                    continue
+                stat = os.stat(path)
+                content_type, _ = mimetypes.guess_type(filename)
+                files[self.prefix + name] = {
+                    'path': path,
+                    'size': stat.st_size,
+                    'headers': [
+                        ('Content-Type', content_type or 'application/octet-stream'),
+                        ('Cache-Control', IMMUTABLE if name in hashed else REVALIDATE),
+                        ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+                    ],
+                    'etag': f'"{stat.st_size:x}-{int(stat.st_mtime):x}"',
+                    'variants': [(encoding, path + suffix, os.path.getsize(path + suffix))
+                                 for encoding, suffix in ENCODINGS
+                                 if os.path.exists(path + suffix)],
+                }
+        return files
+
+    def resolve(self, path, method, accept_encoding='', if_none_match=None):
+        """The response for a static file request as (status, headers,
+        file to send or None), or None to pass the request on."""
+        entry = self.files.get(path)
+        if entry is None or method not in ('GET', 'HEAD'):
+            return None
+
+        path, size, etag = entry['path'], entry['size'], entry['etag']
+        headers = list(entry['headers'])
+        if entry['variants']:
+            headers.append(('Vary', 'Accept-Encoding'))
+            qualities = accepted_encodings(accept_encoding)
+            for encoding, variant, variant_size in entry['variants']:
+                # q=0 refuses a coding; '*' covers the ones not listed.
+                if qualities.get(encoding, qualities.get('*', 0)) > 0:
+                    path, size = variant, variant_size
+                    etag = f'{etag[:-1]}-{encoding}"'
+                    headers.append(('Content-Encoding', encoding))
+                    break
+        headers.append(('ETag', etag))
+
+        if if_none_match and etag_matches(if_none_match, etag):
+            return 304, headers, None
+        headers.append(('Content-Length', str(size)))
+        return 200, headers, None if method == 'HEAD' else path
+
+    def __call__(self, environ, start_response):
+        resolved = self.resolve(
+            environ.get('PATH_INFO', ''), environ.get('REQUEST_METHOD'),
+            environ.get('HTTP_ACCEPT_ENCODING', ''), environ.get('HTTP_IF_NONE_MATCH'))
+        if resolved is None:
+            return self.application(environ, start_response)
+
+        status, headers, path = resolved
+        start_response('200 OK' if status == 200 else '304 Not Modified', headers)
+        if path is None:
+            return []
+        wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return wrapper(open(path, 'rb'))
+
+
+class AsgiStaticFiles(StaticFiles):
+    """StaticFiles for an ASGI application."""
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.application(scope, receive, send)
+
+        headers = {name.decode('latin-1'): value.decode('latin-1')
+                   for name, value in scope.get('headers', [])}
+        resolved = self.resolve(
+            scope['path'], scope['method'],
+            headers.get('accept-encoding', ''), headers.get('if-none-match'))
+        if resolved is None:
+            return await self.application(scope, receive, send)
+
+        status, headers, path = resolved
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in headers],
+        })
+        if path is None:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        with open(path, 'rb') as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, CHUNK_SIZE)
+                more = len(chunk) == CHUNK_SIZE
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': more})
+                if not more:
+                    break
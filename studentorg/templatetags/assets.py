@@ -0,0 +1,39 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.storage import storages
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from studentorg.assets import BUNDLES, VENDORED
+from studentorg.storage import BundledManifestStorage
+
+register = template.Library()
+
+
+def _tag(name, url):
+    if name.endswith('.css'):
+        return format_html('<link rel="stylesheet" href="{}">', url)
+    return format_html('<script src="{}"></script>', url)
+
+
+@register.simple_tag
+def bundle(name):
+    """Link a bundle from studentorg.assets.BUNDLES, or its sources one by
+    one when collectstatic has not built it (development)."""
+    if isinstance(storages['staticfiles'], BundledManifestStorage):
+        return _tag(name, static(name))
+    return format_html_join('\n', '{}', ((_tag(source, static(source)),) for source in BUNDLES[name]))
+
+
+@lru_cache
+def _vendored(name):
+    return bool(finders.find(name) or staticfiles_storage.exists(name))
+
+
+@register.simple_tag
+def vendored(name):
+    """Link the local copy of a CDN asset, or the CDN while it is missing."""
+    return _tag(name, static(name) if _vendored(name) else VENDORED[name])
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertions:
+    """TestCase mixin that guards views against N+1 regressions."""
+
+    def assertConstantQueries(self, url, target, attribute='paginate_by', sizes=(1, 5, 25)):
+        """Assert ``url`` issues the same number of queries at every page size.
+
+        ``target`` is the view class or ModelAdmin instance whose
+        ``attribute`` sets the page size, e.g. ``StudentList`` or
+        ``admin.site._registry[OrgMember]`` with ``'list_per_page'``. The
+        fixture data must hold at least ``max(sizes)`` rows.
+        """
+        # Warm up first so one-off lookups (e.g. search index detection)
+        # don't count against the smallest page size.
+        self.client.get(url)
+
+        counts = {}
+        for size in sizes:
+            # A cached table fragment would hide the queries it renders.
+            cache.clear()
+            with mock.patch.object(target, attribute, size):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            counts[size] = len(queries)
+
+        if len(set(counts.values())) > 1:
+            self.fail(f'{url} query count depends on page size: {counts}')
@@ -1,3 +1,883 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import json
+import os
+import runpy
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.deletion import Collector
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from setup import settings as setup_settings
+from studentorg import (audit, benchmark, cache as generations, charts, counters, deletion, export, importer,
+                        jobs, replication, routers, search, views)
+from studentorg.models import College, Program, Organization, Student, OrgMember, SemesterStats, Job
+from studentorg.auth import CachedModelBackend
+from studentorg.middleware import ReadReplicaMiddleware, RequestProfileBuffer, fingerprint
+from studentorg.pagination import CursorPaginator
+from studentorg.staticserver import AsgiStaticFiles, StaticFiles
+from studentorg.testing import QueryCountAssertions
+from studentorg.views import OrganizationList
+
+
+def create_school(students=12, year=2023):
+    """Three colleges, five programs, four organizations and ``students``
+    students, with ids starting at ``year``, with zero to two memberships
+    each."""
+    colleges = [College.objects.create(college_name=f'College {i}') for i in range(3)]
+    programs = [Program.objects.create(prog_name=f'Program {i}', college=colleges[i % 3])
+                for i in range(5)]
+    organizations = [Organization.objects.create(name=f'Organization {i}', college=colleges[i % 2],
+                                                 description='') for i in range(4)]
+    for i in range(students):
+        student = Student.objects.create(
+            student_id=f'{year}-{i:05}', lastname=f'Lastname {i}', firstname=f'Firstname{i}',
+            program=programs[i % 5], college=colleges[i % 3])
+        for j in range(i % 3):
+            OrgMember.objects.create(student=student, organization=organizations[(i + j) % 4],
+                                     date_joined=datetime.date(2023, 1 + (i * 2) % 12, 1))
+
+
+def settings_with(**environ):
+    """The project settings as evaluated with ``environ`` applied to the
+    environment; a None value unsets the variable."""
+    with mock.patch.dict(os.environ):
+        for name, value in environ.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        return runpy.run_path(setup_settings.__file__)
+
+
+class ImporterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.college = College.objects.create(college_name='College of Sciences')
+        cls.program = Program.objects.create(prog_name='BS Computer Science', college=cls.college)
+
+    def test_short_row_is_reported(self):
+        f = io.StringIO(
+            'student_id,lastname,firstname,program\n'
+            '2024-00001,Cruz,Juan,BS Computer Science\n'
+            '2024-00002,Santos\n'
+        )
+        report = importer.run('students', f)
+        self.assertEqual(report.created, 1)
+        self.assertEqual([error['line'] for error in report.errors], [3])
+        self.assertIn('firstname', report.errors[0]['errors'])
+        self.assertIn('program', report.errors[0]['errors'])
+        self.assertEqual(list(Student.objects.values_list('student_id', flat=True)), ['2024-00001'])
+
+
+class AutocompleteSelectTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_invalid_choice_is_a_form_error(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('student-add'), {
+            'student_id': '2024-00001', 'lastname': 'Cruz', 'firstname': 'Juan',
+            'program': 'zz', 'college': 'zz',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('program', response.context['form'].errors)
+
+    def test_forms_and_their_autocomplete_need_a_login(self):
+        for url in (reverse('student-add'), reverse('autocomplete', args=['program'])):
+            response = self.client.get(url)
+            self.assertRedirects(response, f"{reverse('login')}?next={url}", fetch_redirect_response=False)
+
+
+class CountLimitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        college = College.objects.create(college_name='College of Sciences')
+        Organization.objects.bulk_create(
+            Organization(name=f'Org {i:02}', college=college, description='') for i in range(11))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_pages_past_the_limit_stay_reachable(self):
+        url = reverse('organization-list')
+        with mock.patch.object(OrganizationList, 'count_limit', 3), \
+                mock.patch.object(OrganizationList, 'paginate_by', 2):
+            pages = []
+            for number in range(1, 7):
+                response = self.client.get(url, {'page': number})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context['paginator'].many)
+                pages.append([org.name for org in response.context['page_obj']])
+            self.assertFalse(response.context['page_obj'].has_next())
+            self.assertEqual(self.client.get(url, {'page': 7}).status_code, 404)
+        self.assertEqual(sum(pages, []), [f'Org {i:02}' for i in range(11)])
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        college = College.objects.create(college_name='College of Sciences')
+        program = Program.objects.create(prog_name='BS Computer Science', college=college)
+        for student_id, firstname, lastname in [('2024-00001', 'Cruz', 'Dela Cruz'),
+                                                ('2024-00002', 'Ana', 'Cruz'),
+                                                ('2024-00003', 'Ana', 'Santos')]:
+            Student.objects.create(student_id=student_id, firstname=firstname, lastname=lastname,
+                                    program=program, college=college)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_search_pages_keep_rank_order(self):
+        response = self.client.get(reverse('student-list'), {'q': 'cruz'})
+        page = response.context['page_obj']
+        self.assertFalse(getattr(page, 'is_cursor', False))
+        ranked = list(search.search(Student.objects.all(), 'cruz').values_list('student_id', flat=True))
+        self.assertEqual([student.student_id for student in page], ranked)
+        self.assertEqual(ranked, ['2024-00001', '2024-00002'])
+
+    def test_index_follows_edits_but_not_other_updates(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'studentorg_student_fts_au'")
+            self.assertIn('AFTER UPDATE OF firstname, lastname, middlename, student_id ON',
+                          cursor.fetchone()[0])
+        Student.objects.filter(student_id='2024-00003').update(lastname='Reyes')
+        found = search.search(Student.objects.all(), 'reyes')
+        self.assertEqual([student.student_id for student in found], ['2024-00003'])
+
+
+class SetBasedCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sciences = College.objects.create(college_name='College of Sciences')
+        cls.arts = College.objects.create(college_name='College of Arts')
+        cls.cs = Program.objects.create(prog_name='BS Computer Science', college=cls.sciences)
+        cls.ab = Program.objects.create(prog_name='AB Communication', college=cls.arts)
+        cls.club = Organization.objects.create(name='Chess Club', college=cls.arts, description='')
+        for i, program in enumerate([cls.cs, cls.cs, cls.ab]):
+            student = Student.objects.create(student_id=f'2024-0000{i}', firstname='Ana',
+                                             lastname=f'Cruz {i}', program=program, college=program.college)
+            OrgMember.objects.create(student=student, organization=cls.club,
+                                     date_joined=f'2024-0{i + 1}-15')
+
+    def assertNoDrift(self):
+        report = counters.rebuild(dry_run=True)
+        self.assertEqual({name: n for name, n in report.items() if n}, {})
+
+    def test_delete_adjusts_counters(self):
+        deletion.delete(self.sciences, chunk_size=1)
+        self.assertNoDrift()
+        self.assertEqual(Organization.objects.get().member_count, 1)
+        self.assertEqual(SemesterStats.objects.get(year=2024, term=SemesterStats.SPRING).member_count, 1)
+
+    def test_import_adjusts_counters(self):
+        importer.run('students', io.StringIO(
+            'student_id,lastname,firstname,program\n'
+            '2024-00000,Cruz 0,Ana,AB Communication\n'
+            '2024-00009,Reyes,Jose,BS Computer Science\n'))
+        importer.run('members', io.StringIO(
+            'student_id,organization,date_joined\n'
+            '2024-00001,Chess Club,2023-09-01\n'
+            '2024-00009,Chess Club,2024-08-01\n'))
+        self.assertNoDrift()
+        self.assertEqual(Program.objects.get(pk=self.ab.pk).student_count, 2)
+        self.assertEqual(SemesterStats.objects.get(year=2023, term=SemesterStats.FALL).member_count, 1)
+
+
+class ReplicaLagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.view = routers.replica_reads(models=(Student,))(lambda request: routers._use_replica.get())
+        self.request = RequestFactory().get('/')
+
+    def test_reads_stay_on_primary_right_after_a_write(self):
+        with mock.patch('studentorg.routers.replica_alias', return_value='replica'):
+            generations.touch(Student)
+            self.assertFalse(self.view(self.request))
+            with override_settings(READ_REPLICA_MAX_LAG=0):
+                self.assertTrue(self.view(self.request))
+
+    def test_router_reads_replica_only_inside_replica_views(self):
+        router = routers.ReadReplicaRouter()
+        with mock.patch('studentorg.routers.replica_alias', return_value='replica'):
+            self.assertEqual(router.db_for_read(Student), 'default')
+            with routers.reading_from_replica():
+                # Inside the test's transaction reads must stay on it.
+                self.assertEqual(router.db_for_read(Student), 'default')
+                with mock.patch.object(connection, 'in_atomic_block', False):
+                    self.assertEqual(router.db_for_read(Student), 'replica')
+            self.assertEqual(router.db_for_write(Student), 'default')
+
+    @override_settings(READ_REPLICA_MAX_LAG=0, READ_REPLICA_STICKY_SECONDS=5)
+    def test_writes_pin_the_next_reads_to_the_primary(self):
+        generations.generation(Student)
+        seen = []
+        middleware = ReadReplicaMiddleware(lambda request: seen.append(self.view(request)) or HttpResponse())
+        factory = RequestFactory()
+        with mock.patch('studentorg.routers.replica_alias', return_value='replica'):
+            response = middleware(factory.post('/'))
+            cookie = response.cookies['read_primary']
+            self.assertEqual(cookie['max-age'], 5)
+            middleware(factory.get('/', HTTP_COOKIE=f'read_primary={cookie.value}'))
+            middleware(factory.get('/'))
+        self.assertEqual(seen, [False, False, True])
+
+    def test_a_copy_does_not_move_generations(self):
+        before = generations.version(Student)
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch('studentorg.replication._path', return_value=str(Path(tmp) / 'replica.sqlite3')):
+            source = sqlite3.connect(':memory:')
+            source.execute('CREATE TABLE t (x)')
+            replication.copy(source, 'replica')
+            source.close()
+        self.assertEqual(generations.version(Student), before)
+
+
+class ChartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sciences = College.objects.create(college_name='College of Sciences')
+        arts = College.objects.create(college_name='College of Arts')
+        club = Organization.objects.create(name='Chess Club', college=arts, description='')
+        for i, college in enumerate([sciences, arts]):
+            # Same-named programs in two colleges chart as one.
+            program = Program.objects.create(prog_name='BS Mathematics', college=college)
+            student = Student.objects.create(student_id=f'2024-0000{i}', firstname='Ana',
+                                             lastname='Cruz', program=program, college=college)
+            OrgMember.objects.create(student=student, organization=club,
+                                     date_joined=['2024-09-01', '2024-03-01'][i])
+
+    def test_student_programs(self):
+        self.assertEqual(charts.student_programs(), {
+            'labels': ['BS Mathematics'], 'student_counts': [2], 'org_memberships': [2]})
+
+    def test_member_trends_run_in_order(self):
+        self.assertEqual(charts.member_trends()['labels'], ['2024 Spring', '2024 Fall'])
+
+
+class BenchmarkCompareTests(TestCase):
+    def test_other_database_is_a_warning(self):
+        report = {'meta': {'database': 'sqlite'}, 'scenarios': {'home': {'queries': 3, 'p50_ms': 9}}}
+        baseline = {'meta': {'database': 'postgresql'}, 'scenarios': {'home': {'queries': 1, 'p50_ms': 1}}}
+        regressions, warnings = benchmark.compare(report, baseline)
+        self.assertEqual(regressions, [])
+        self.assertEqual(len(warnings), 1)
+
+
+class AuditTests(TestCase):
+    def test_no_unexpected_full_scans(self):
+        create_school()
+        call_command('audit_indexes', '--fail', stdout=io.StringIO())
+
+    def test_full_scans(self):
+        plan = ['SCAN studentorg_student', 'SCAN x USING INDEX y', 'SCAN studentorg_semesterstats']
+        self.assertEqual(audit.full_scans(plan, 'sqlite'), ['studentorg_student'])
+
+    def test_async_list_views_are_captured(self):
+        College.objects.create(college_name='College of Sciences')
+        targets = dict(audit.list_targets())
+        statements = audit.capture(targets['list:college'])
+        self.assertTrue(any('"studentorg_college"' in sql for sql, _ in statements))
+
+
+class StaticFilesTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        (root / 'app.js').write_text('plain')
+        (root / 'app.js.gz').write_text('gz')
+        self.root = root
+
+    def wsgi(self, accept_encoding):
+        application = StaticFiles(None, root=self.root, prefix='/static/')
+        started = {}
+        body = application({'PATH_INFO': '/static/app.js', 'REQUEST_METHOD': 'GET',
+                            'HTTP_ACCEPT_ENCODING': accept_encoding},
+                           lambda status, headers: started.update(headers=dict(headers)))
+        return started['headers'], b''.join(body)
+
+    def test_q_values(self):
+        self.assertEqual(self.wsgi('gzip, deflate')[1], b'gz')
+        self.assertEqual(self.wsgi('gzip;q=0, deflate')[1], b'plain')
+        self.assertEqual(self.wsgi('*;q=0.5')[1], b'gz')
+        self.assertEqual(self.wsgi('gzip;q=0, *')[1], b'plain')
+
+    def test_conditional_requests_use_weak_comparison(self):
+        application = StaticFiles(None, root=self.root, prefix='/static/')
+        _, headers, _ = application.resolve('/static/app.js', 'GET')
+        etag = dict(headers)['ETag']
+        for header in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+            self.assertEqual(application.resolve('/static/app.js', 'GET', if_none_match=header)[0], 304)
+        self.assertEqual(application.resolve('/static/app.js', 'GET', if_none_match='"other"')[0], 200)
+
+    def test_manifest_is_not_served(self):
+        (self.root / 'staticfiles.json').write_text('{"paths": {}}')
+        application = StaticFiles(None, root=self.root, prefix='/static/')
+        self.assertIsNone(application.resolve('/static/staticfiles.json', 'GET'))
+
+    def test_asgi(self):
+        application = AsgiStaticFiles(None, root=self.root, prefix='/static/')
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'path': '/static/app.js', 'method': 'GET',
+                 'headers': [(b'accept-encoding', b'gzip')]}
+        async_to_sync(application)(scope, None, send)
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-encoding', b'gzip'), sent[0]['headers'])
+        self.assertEqual(b''.join(message.get('body', b'') for message in sent[1:]), b'gz')
+
+
+class CreateInitialDataTests(TestCase):
+    def test_reports_rows_actually_inserted(self):
+        college = College.objects.create(college_name='College of Sciences')
+        Program.objects.create(prog_name='BS Computer Science', college=college)
+        # Memberships are unique per student and organization, so a second
+        # run over the same single pair inserts nothing.
+        call_command('create_initial_data', orgs=1, students=1, members=1, stdout=io.StringIO())
+        out = io.StringIO()
+        call_command('create_initial_data', orgs=0, students=0, members=1, stdout=out)
+        self.assertIn('student organization created successfully: 0 rows', out.getvalue())
+        self.assertIn('1 duplicates skipped', out.getvalue())
+        self.assertEqual(OrgMember.objects.count(), 1)
+
+
+class QueryCountTests(QueryCountAssertions, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for year in (2021, 2022, 2023):
+            create_school(year=year)
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_list_views(self):
+        self.assertConstantQueries(reverse('orgmember-list'), views.OrgMemberList, sizes=(1, 5, 20))
+        self.assertConstantQueries(reverse('orgmember-list') + '?q=Firstname', views.OrgMemberList,
+                                   sizes=(1, 5, 20))
+        self.assertConstantQueries(reverse('student-list'), views.StudentList)
+        self.assertConstantQueries(reverse('program-list'), views.ProgramList, sizes=(1, 5, 15))
+        self.assertConstantQueries(reverse('organization-list'), views.OrganizationList, sizes=(1, 5, 12))
+
+    def test_admin_changelists(self):
+        for model in (OrgMember, Student):
+            url = reverse(f'admin:studentorg_{model._meta.model_name}_changelist')
+            self.assertConstantQueries(url, admin.site._registry[model], 'list_per_page')
+
+    def test_detects_n_plus_one(self):
+        with mock.patch.object(views.OrgMemberList, 'select_related', ()):
+            with self.assertRaises(AssertionError):
+                self.assertConstantQueries(reverse('orgmember-list'), views.OrgMemberList, sizes=(1, 5))
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_export(self):
+        url = reverse('export', args=['students'])
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.user)
+        response = self.client.get(url, {'gzip': '1', 'format': 'jsonl'})
+        self.assertEqual(len(gzip.decompress(b''.join(response.streaming_content)).splitlines()), 12)
+        response = self.client.get(reverse('export', args=['members']), {'q': 'Firstname5'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines) - 1, OrgMember.objects.filter(student__firstname='Firstname5').count())
+        self.assertEqual(self.client.get(reverse('export', args=['nope'])).status_code, 404)
+
+    async def test_asgi_export_streams_in_chunks(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        with mock.patch.object(export, 'CHUNK_SIZE', 5):
+            response = await client.get(reverse('export', args=['students']))
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        # The header, then the 12 students five at a time.
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(len(b''.join(chunks).decode().splitlines()), 13)
+
+
+class DeletionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_preview_matches_the_collector(self):
+        college = College.objects.get(college_name='College 0')
+        collector = Collector(using='default')
+        collector.collect([college])
+        expected = {model._meta.verbose_name_plural: len(objs)
+                    for model, objs in collector.data.items() if model is not College and objs}
+        for qs in collector.fast_deletes:
+            name = qs.model._meta.verbose_name_plural
+            expected[name] = expected.get(name, 0) + qs.count()
+        self.assertEqual(dict(deletion.preview(college)), {k: v for k, v in expected.items() if v})
+
+    def test_delete_view_runs_the_job(self):
+        self.client.force_login(self.user)
+        college = College.objects.get(college_name='College 0')
+        response = self.client.post(reverse('college-delete', args=[college.pk]))
+        self.assertRedirects(response, reverse('college-list'), fetch_redirect_response=False)
+        self.assertFalse(College.objects.filter(pk=college.pk).exists())
+        self.assertFalse(Student.objects.filter(college_id=college.pk).exists())
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def test_each_cascade_path_is_one_indexed_lookup(self):
+        college = College.objects.get(college_name='College 0')
+        # Program, Organization and Student by college, Student by program,
+        # OrgMember by student and by organization.
+        with self.assertNumQueries(6):
+            steps = deletion.plan(college)
+        self.assertEqual([model for model, _ in steps],
+                         [OrgMember, Student, Program, Organization, College])
+        students = Student.objects.filter(Q(college=college) | Q(program__college=college))
+        self.assertEqual(set(dict(steps)[Student]), set(students.values_list('pk', flat=True)))
+
+
+@override_settings(JOB_QUEUE_INLINE=False, JOB_RETRY_DELAY=30)
+class JobTests(TestCase):
+    def test_a_job_is_claimed_once(self):
+        job = jobs.enqueue('command', {'name': 'rebuild_counters', 'options': {}})
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(jobs.claim('first').pk, job.pk)
+        self.assertIsNone(jobs.claim('second'))
+
+    def test_failures_are_retried_then_failed(self):
+        job = jobs.enqueue('command', {'name': 'flush', 'options': {}}, max_attempts=2)
+        with self.assertLogs('studentorg.jobs', 'ERROR'):
+            jobs.execute(jobs.claim('worker'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreater(job.run_after, job.updated_at)
+
+        Job.objects.filter(pk=job.pk).update(run_after=job.updated_at)
+        with self.assertLogs('studentorg.jobs', 'ERROR'):
+            jobs.execute(jobs.claim('worker'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('cannot run as a job', job.error)
+
+    def test_stale_jobs_are_requeued(self):
+        job = jobs.enqueue('command', {'name': 'rebuild_counters', 'options': {}})
+        jobs.claim('worker')
+        Job.objects.filter(pk=job.pk).update(
+            updated_at=job.created_at - datetime.timedelta(hours=2))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+
+    def test_status_endpoint(self):
+        job = jobs.enqueue('command', {'name': 'rebuild_counters', 'options': {}})
+        jobs.execute(jobs.claim('worker'))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        status = self.client.get(reverse('job-status', args=[job.pk])).json()
+        self.assertEqual(status['status'], Job.DONE)
+        self.assertIn('output', status['result'])
+
+    def test_commands_heartbeat_while_running(self):
+        beat = threading.Event()
+        progress = mock.Mock(side_effect=lambda *args: beat.set())
+        with override_settings(JOB_STALE_SECONDS=0.04), \
+                mock.patch('studentorg.jobs.call_command', side_effect=lambda *args, **kwargs: beat.wait(5)):
+            jobs._command(progress, 'rebuild_counters', {})
+        progress.assert_called_with(0)
+
+
+class FullTextSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        Student.objects.create(student_id='2021-3-1234', lastname='Dela Cruz', firstname='José',
+                               program=Program.objects.first(), college=College.objects.first())
+
+    def test_prefix_accent_and_id_matching(self):
+        self.assertTrue(search.fts_available())
+        students = Student.objects.all()
+        self.assertEqual([s.lastname for s in search.search(students, 'dela cru')], ['Dela Cruz'])
+        self.assertEqual(search.search(students, 'jose').count(), 1)
+        self.assertEqual(search.search(students, '2021-3').count(), 1)
+        self.assertEqual(search.search(students, '"').count(), 0)
+
+    def test_memberships_match_through_students_and_organizations(self):
+        members = OrgMember.objects.all()
+        self.assertEqual(search.search(members, 'Firstname5').count(),
+                         OrgMember.objects.filter(student__firstname='Firstname5').count())
+        self.assertEqual(search.search(members, 'Organization 1').count(),
+                         OrgMember.objects.filter(organization__name='Organization 1').count())
+
+    def test_index_follows_saves_and_deletes(self):
+        student = Student.objects.get(firstname='Firstname5')
+        student.firstname = 'Zed'
+        student.save()
+        self.assertEqual(search.search(Student.objects.all(), 'Firstname5').count(), 0)
+        self.assertEqual(search.search(Student.objects.all(), 'zed').count(), 1)
+        Student.objects.filter(firstname='Zed').delete()
+        self.assertEqual(search.search(Student.objects.all(), 'zed').count(), 0)
+
+    def test_list_views_search(self):
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse('student-list'), {'q': 'dela'}), 'Dela Cruz')
+        self.assertContains(self.client.get(reverse('college-list'), {'q': 'College 1'}), 'College 1')
+        self.assertContains(self.client.get(reverse('program-list'), {'q': 'Program'}), 'Program 1')
+        self.assertContains(self.client.get(reverse('organization-list'), {'q': 'Organization 2'}),
+                            'Organization 2')
+
+    def test_equal_ranks_keep_id_order(self):
+        for i in range(3):
+            Student.objects.create(student_id=f'2022-{i:05}', lastname='Santos', firstname='Maria',
+                                   program=Program.objects.first(), college=College.objects.first())
+        matches = search.search(Student.objects.all(), 'santos')
+        self.assertEqual(list(matches.values_list('pk', flat=True)),
+                         sorted(Student.objects.filter(lastname='Santos').values_list('pk', flat=True)))
+        self.assertEqual(len({student.search_rank for student in matches}), 1)
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        # Ties on created_at are broken by id.
+        Student.objects.filter(id__lte=6).update(created_at=Student.objects.first().created_at)
+
+    def test_walk_forward_and_back(self):
+        expected = list(Student.objects.order_by('-created_at', '-id'))
+        paginator = CursorPaginator(Student.objects.all(), 5)
+        page = paginator.page()
+        seen = list(page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            seen += list(page)
+        self.assertEqual(seen, expected)
+
+        back = []
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            back = list(page) + back
+        self.assertEqual(back, expected[:len(back)])
+        self.assertEqual(len(back), 10)
+
+    def test_list_views_default_to_numbered_pages(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('student-list'))
+        self.assertNotIn('?cursor=', response.content.decode())
+        self.assertContains(response, '?page=2')
+        self.assertContains(self.client.get(reverse('student-list'), {'cursor': ''}), '?cursor=')
+        self.assertEqual(self.client.get(reverse('student-list'), {'cursor': 'zz!'}).status_code, 404)
+
+    def test_cursor_is_ignored_by_other_orderings(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('college-list'), {'cursor': ''})
+        self.assertFalse(getattr(response.context['page_obj'], 'is_cursor', False))
+        self.assertEqual([c.college_name for c in response.context['page_obj']],
+                         sorted(College.objects.values_list('college_name', flat=True)))
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_list_fragment_is_rerendered_after_a_write(self):
+        url = reverse('college-list')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            College.objects.create(college_name='AAA College')
+        self.assertContains(self.client.get(url), 'AAA College')
+
+    def test_home_page_reads_no_data(self):
+        self.client.get(reverse('home'))
+        # Only the session and user lookups; the charts load their own data.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('home'))
+        self.assertNotIn('page_obj', response.context)
+
+
+class DashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_chart_endpoints_match_dashboard_stats(self):
+        stats = self.client.get(reverse('dashboard-stats')).json()
+        for name, key in [('radar-chart', 'org_participation'), ('bubble-chart', 'student_programs'),
+                          ('horizontal-bar-chart', 'top_organizations'),
+                          ('stacked-bar-chart', 'member_trends'),
+                          ('doughnut-chart', 'program_distribution')]:
+            self.assertEqual(self.client.get(reverse(name)).json(), stats[key], name)
+
+    def test_trend_parameters_are_validated(self):
+        url = reverse('stacked-bar-chart')
+        self.assertEqual(self.client.get(url, {'granularity': 'month', 'start': '2023-02-01'}).status_code, 200)
+        self.assertEqual(self.client.get(url, {'granularity': 'week'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '2023-13-01'}).status_code, 400)
+
+
+class CacheInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_chart_payload_is_cached_until_a_write(self):
+        url = reverse('dashboard-stats')
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).content, response.content)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            College.objects.create(college_name='College of Law')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('College of Law', response.json()['program_distribution']['labels'])
+
+    def test_bulk_updates_invalidate_through_touch(self):
+        before = generations.version(Student)
+        counters.rebuild()
+        self.assertNotEqual(generations.version(Student), before)
+
+
+class QueryInstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('college-list'))
+        timing = dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'app', 'total'})
+        self.assertRegex(timing['db'], r'^dur=[\d.]+;desc="[1-9]\d* queries"$')
+
+    @override_settings(REQUEST_PROFILE_SLOW_MS=0)
+    def test_slow_requests_log_a_json_line(self):
+        with self.assertLogs('studentorg.requests', 'WARNING') as logs:
+            self.client.get(reverse('college-list'))
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((entry['path'], entry['view'], entry['status']),
+                         (reverse('college-list'), 'college-list', 200))
+        self.assertGreater(entry['queries'], 0)
+        self.assertLessEqual(len(entry['slowest']), 3)
+
+    def test_profiles_are_kept_in_a_ring_buffer(self):
+        buffer = RequestProfileBuffer(2)
+        for i in range(3):
+            buffer.append({'n': i})
+        self.assertEqual(buffer.entries(), [{'n': 1}, {'n': 2}])
+
+        self.client.get(reverse('college-list'))
+        requests = self.client.get(reverse('request-profiles')).json()['requests']
+        self.assertEqual(requests[-1]['path'], reverse('college-list'))
+
+    def test_repeated_statements_are_grouped(self):
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"),
+                         'SELECT * FROM t WHERE id IN (...) AND name = ?')
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+
+    def test_students_are_upserted(self):
+        report = importer.run('students', io.StringIO(
+            'student_id,lastname,firstname,middlename,program,college\n'
+            '2023-00001,Reyes,Ana,,Program 2,\n'
+            '2024-00001,Santos,Jose,,Program 0,College 2\n'
+            '2024-00001,Santos,Josefa,,Program 0,College 2\n'
+            '2024-00002,,Jose,,Program 9,\n'), batch_size=2)
+        self.assertEqual((report.created, report.updated, len(report.errors)), (1, 2, 1))
+        student = Student.objects.get(student_id='2023-00001')
+        self.assertEqual((student.lastname, student.program.prog_name, student.college.college_name),
+                         ('Reyes', 'Program 2', 'College 2'))
+        self.assertEqual(Student.objects.get(student_id='2024-00001').firstname, 'Josefa')
+
+    def test_members_and_error_report(self):
+        report = importer.run('members', io.BytesIO(
+            b'student_id,organization,date_joined\n'
+            b'2023-00000,Organization 0,2024-09-01\n'
+            b'2023-00003,Organization 3,notadate\n'))
+        member = OrgMember.objects.get(student__student_id='2023-00000', organization__name='Organization 0')
+        self.assertEqual((member.join_year, member.join_term), (2024, SemesterStats.FALL))
+        out = io.StringIO()
+        report.write_errors(out)
+        self.assertIn('3,date_joined,', out.getvalue())
+
+    def test_missing_columns(self):
+        report = importer.run('members', io.StringIO('x,y\n1,2\n'))
+        self.assertEqual(report.errors[0]['line'], 1)
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_school()
+
+    def assertNoDrift(self):
+        report = counters.rebuild(dry_run=True)
+        self.assertEqual({name: n for name, n in report.items() if n}, {})
+
+    def test_signals_keep_counters_in_step(self):
+        student = Student.objects.first()
+        student.program = Program.objects.last()
+        student.save()
+        member = OrgMember.objects.first()
+        member.date_joined = datetime.date(2020, 9, 1)
+        member.organization = Organization.objects.last()
+        member.save()
+        organization = Organization.objects.first()
+        organization.college = None
+        organization.save()
+        Program.objects.get(prog_name='Program 2').delete()
+        College.objects.get(college_name='College 1').delete()
+        self.assertNoDrift()
+
+    def test_saving_a_stale_instance_keeps_its_counter(self):
+        organization = Organization.objects.first()
+        before = organization.member_count
+        student = Student.objects.create(student_id='2024-00001', lastname='Cruz', firstname='Ana',
+                                         program=Program.objects.first(), college=College.objects.first())
+        OrgMember.objects.create(student=student, organization=organization,
+                                 date_joined=datetime.date(2023, 3, 1))
+        organization.description = 'Updated'
+        organization.save()
+        organization.refresh_from_db()
+        self.assertEqual(organization.member_count, before + 1)
+
+    def test_rebuild_repairs_drift(self):
+        organization = Organization.objects.first()
+        expected = organization.member_count
+        Organization.objects.filter(pk=organization.pk).update(member_count=99)
+        self.assertEqual(counters.rebuild()['Organization.member_count'], 1)
+        organization.refresh_from_db()
+        self.assertEqual(organization.member_count, expected)
+
+
+class DatabaseProfileTests(TestCase):
+    def test_profiles(self):
+        tuned = settings_with(DJANGO_DB_PROFILE='tuned')['DATABASES']['default']
+        self.assertGreater(tuned['CONN_MAX_AGE'], 0)
+        self.assertTrue(tuned['CONN_HEALTH_CHECKS'])
+        self.assertEqual(tuned['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        stock = settings_with(DJANGO_DB_PROFILE='stock')['DATABASES']['default']
+        self.assertEqual((stock['CONN_MAX_AGE'], stock['CONN_HEALTH_CHECKS'], stock['OPTIONS']),
+                         (0, False, {}))
+
+    def test_tuned_connections_apply_the_pragmas(self):
+        options = settings_with(DJANGO_DB_PROFILE='tuned')['SQLITE_OPTIONS']['tuned']
+        with tempfile.TemporaryDirectory() as tmp:
+            settings_dict = {**connection.settings_dict, 'NAME': str(Path(tmp) / 'db.sqlite3'),
+                             'OPTIONS': options}
+            wrapper = type(connections['default'])(settings_dict, alias='tuned')
+            try:
+                with wrapper.cursor() as cursor:
+                    pragmas = {name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                               for name in ('journal_mode', 'busy_timeout', 'synchronous')}
+            finally:
+                wrapper.close()
+        # synchronous=NORMAL reads back as 1.
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'busy_timeout': 5000, 'synchronous': 1})
+
+
+class SessionAuthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('ana', 'ana@example.com', 'password')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                              'LOCATION': directory.name}}
+        override = override_settings(CACHES=shared)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.backend = CachedModelBackend()
+
+    def test_users_are_cached_until_saved(self):
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_local_memory_cache_is_not_used(self):
+        with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.backend.get_user(self.user.pk)
+            with self.assertNumQueries(1):
+                self.backend.get_user(self.user.pk)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies',
+                       AUTHENTICATION_BACKENDS=['studentorg.auth.CachedModelBackend'])
+    def test_page_views_skip_session_and_user_queries(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('home'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('home')).status_code, 200)
+        self.assertFalse([query['sql'] for query in queries
+                          if 'auth_user' in query['sql'] or 'django_session' in query['sql']])
+
+    def test_session_profiles(self):
+        local = settings_with(DJANGO_SESSION_PROFILE=None, DJANGO_CACHE_DIR=None)
+        self.assertEqual((local['SESSION_ENGINE'], local['AUTHENTICATION_BACKENDS']),
+                         ('django.contrib.sessions.backends.db',
+                          ['django.contrib.auth.backends.ModelBackend']))
+        with self.assertRaises(ImproperlyConfigured):
+            settings_with(DJANGO_SESSION_PROFILE='cached_db', DJANGO_CACHE_DIR=None)
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = settings_with(DJANGO_SESSION_PROFILE=None, DJANGO_CACHE_DIR=tmp)
+        self.assertEqual((shared['SESSION_ENGINE'], shared['AUTHENTICATION_BACKENDS']),
+                         ('django.contrib.sessions.backends.cached_db',
+                          ['studentorg.auth.CachedModelBackend']))
 
-# Create your tests here.
@@ -0,0 +1,159 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.db import OperationalError, close_old_connections
+
+from studentorg.benchmark import percentile
+
+
+# Throughput under concurrency, as opposed to the per-request latency the
+# benchmark command measures. Each driver issues ``total`` requests over
+# ``paths`` with at most ``concurrency`` in flight and returns the latency
+# of every request plus the statuses seen.
+
+
+def _split(path):
+    path, _, query = path.partition('?')
+    return path, query
+
+
+def _wsgi_request(application, path):
+    path, query = _split(path)
+    environ = {'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_HOST': 'testserver',
+               'SERVER_NAME': 'testserver', 'wsgi.input': io.BytesIO()}
+    setup_testing_defaults(environ)
+    status = []
+
+    def start_response(value, headers, exc_info=None):
+        status.append(int(value.split()[0]))
+
+    started = time.perf_counter()
+    body = application(environ, start_response)
+    try:
+        for _ in body:
+            pass
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    return (time.perf_counter() - started) * 1000, status[0]
+
+
+def drive_wsgi(application, paths, total, concurrency):
+    """Call a WSGI application from a pool of ``concurrency`` threads, the
+    way a threaded WSGI server would."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda path: _wsgi_request(application, path),
+                             islice(cycle(paths), total)))
+
+
+async def _asgi_request(application, path):
+    path, query = _split(path)
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    disconnected = asyncio.Event()
+    status = []
+
+    async def receive():
+        if not status:
+            status.append(None)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            disconnected.set()
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    return (time.perf_counter() - started) * 1000, status[-1]
+
+
+async def _bounded(requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(request):
+        async with semaphore:
+            return await request
+
+    return await asyncio.gather(*(run(request) for request in requests))
+
+
+def drive_asgi(application, paths, total, concurrency):
+    """Run an ASGI application on a single event loop, as uvicorn would."""
+    requests = (_asgi_request(application, path) for path in islice(cycle(paths), total))
+    return asyncio.run(_bounded(requests, concurrency))
+
+
+async def _http_request(base_url, path):
+    url = urlsplit(base_url)
+    port = url.port or (443 if url.scheme == 'https' else 80)
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(
+        url.hostname, port, ssl=url.scheme == 'https' or None)
+    writer.write(f'GET {url.path.rstrip("/")}{path} HTTP/1.1\r\nHost: {url.netloc}\r\n'
+                 f'Connection: close\r\n\r\n'.encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return (time.perf_counter() - started) * 1000, int(status_line.split()[1])
+
+
+def drive_http(base_url, paths, total, concurrency):
+    """Load a running deployment over HTTP, e.g. ``gunicorn setup.wsgi``
+    against ``uvicorn setup.asgi:application``."""
+    requests = (_http_request(base_url, path) for path in islice(cycle(paths), total))
+    return asyncio.run(_bounded(requests, concurrency))
+
+
+def _orm_operation(operation):
+    started = time.perf_counter()
+    try:
+        operation()
+        status = 200
+    except OperationalError:
+        # "database is locked" and friends, which a view would turn into a 500.
+        status = 500
+    finally:
+        # What the end of a request does: drop the connection unless
+        # CONN_MAX_AGE allows keeping it.
+        close_old_connections()
+    return (time.perf_counter() - started) * 1000, status
+
+
+def drive_orm(operations, names, total, concurrency):
+    """Run the ORM callables in ``operations``, cycling through ``names``,
+    from ``concurrency`` threads; each call stands in for one request."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda name: _orm_operation(operations[name]),
+                             islice(cycle(names), total)))
+
+
+def measure(driver, target, paths, total, concurrency):
+    started = time.perf_counter()
+    samples = driver(target, paths, total, concurrency)
+    elapsed = time.perf_counter() - started
+    latencies = [sample[0] for sample in samples]
+    return {
+        'requests': total,
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'rps': round(total / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'errors': sum(1 for _, status in samples if status >= 400),
+    }
@@ -1,172 +1,182 @@
+from django.views.generic.base import TemplateView
 from django.views.generic.list import ListView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
-from studentorg.models import Organization, OrgMember, Student, College, Program
-from studentorg.forms import OrganizationForm, OrgMemberForm, StudentForm, CollegeForm, ProgramForm
+from studentorg.models import Organization, OrgMember, Student, College, Program, Job
+from studentorg.forms import OrganizationForm, OrgMemberForm, StudentForm, CollegeForm, ProgramForm, ImportForm
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
+from django.shortcuts import get_object_or_404, render
 
-from django.db import connection
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.utils.http import url_has_allowed_host_and_scheme
+from studentorg import autocomplete, charts, export, importer, jobs
+from studentorg.cache import cached_json
+from studentorg.middleware import profiles
+from studentorg.mixins import AsyncListMixin, BulkDeleteMixin, FragmentCacheMixin, RelatedObjectsMixin, ReplicaReadMixin
+from studentorg.pagination import CachedCountMixin, CursorPaginationMixin
+from studentorg.routers import replica_reads
+from studentorg.search import search
 
 
 @method_decorator(login_required, name='dispatch')
-class HomePageView(ListView):
-    model = Organization
-    context_object_name = 'home'
+class HomePageView(TemplateView):
+    # The dashboard is static markup; its charts fetch their data from the
+    # cached JSON endpoints below.
     template_name = "home.html"
-    paginate_by = 5
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        return context
-
-    def get_queryset(self, *args, **kwargs):
-        qs = super().get_queryset(*args, **kwargs)
-        if self.request.GET.get("q") != None:
-            query = self.request.GET.get('q')
-            qs = qs.filter(Q(name__icontains=query) |
-                           Q(description__icontains=query))
-        return qs
 
+@cached_json(*charts.SOURCES)
+@replica_reads(models=charts.SOURCES)
+async def DashboardStats(request):
+    return JsonResponse(await charts.adashboard_stats())
 
-def RadarChartOrgParticipation(request):
-    query = '''
-    SELECT c.college_name, COUNT(DISTINCT o.id) as org_count
-    FROM studentorg_college c
-    LEFT JOIN studentorg_organization o ON c.id = o.college_id
-    GROUP BY c.college_name
-    ORDER BY org_count DESC
-    LIMIT 7
-    '''
 
-    with connection.cursor() as cursor:
-        cursor.execute(query)
-        rows = cursor.fetchall()
+@cached_json(*charts.SOURCES)
+@replica_reads(models=charts.SOURCES)
+async def RadarChartOrgParticipation(request):
+    return JsonResponse(await charts.aorg_participation())
 
-    while len(rows) < 7:
-        rows.append(('Placeholder', 0))
 
-    data = {
-        'labels': [row[0] for row in rows],
-        'values': [row[1] for row in rows]
-    }
+@cached_json(*charts.SOURCES)
+@replica_reads(models=charts.SOURCES)
+async def BubbleChartStudentPrograms(request):
+    return JsonResponse(await charts.astudent_programs())
 
-    return JsonResponse(data)
 
+@cached_json(*charts.SOURCES)
+@replica_reads(models=charts.SOURCES)
+async def HorizontalBarTopOrganizations(request):
+    return JsonResponse(await charts.atop_organizations())
 
-def BubbleChartStudentPrograms(request):
-    query = '''
-    SELECT p.prog_name, 
-           COUNT(s.id) as student_count, 
-           COUNT(DISTINCT o.id) as org_membership_count
-    FROM studentorg_program p
-    LEFT JOIN studentorg_student s ON p.id = s.program_id
-    LEFT JOIN studentorg_orgmember o ON s.id = o.student_id
-    GROUP BY p.prog_name
-    ORDER BY student_count DESC
-    LIMIT 10
-    '''
-
-    with connection.cursor() as cursor:
-        cursor.execute(query)
-        rows = cursor.fetchall()
-
-    data = {
-        'labels': [row[0] for row in rows],
-        'student_counts': [row[1] for row in rows],
-        'org_memberships': [row[2] for row in rows]
-    }
-
-    return JsonResponse(data)
 
+def _date_param(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f'{name} must be a YYYY-MM-DD date.')
+    return parsed
 
-def HorizontalBarTopOrganizations(request):
-    query = '''
-    SELECT o.name, COUNT(om.id) as member_count
-    FROM studentorg_organization o
-    LEFT JOIN studentorg_orgmember om ON o.id = om.organization_id
-    GROUP BY o.name
-    ORDER BY member_count DESC
-    LIMIT 5
-    '''
-
-    with connection.cursor() as cursor:
-        cursor.execute(query)
-        rows = cursor.fetchall()
-
-    data = {
-        'labels': [row[0] for row in rows],
-        'member_counts': [row[1] for row in rows]
-    }
-
-    return JsonResponse(data)
-
-
-def StackedBarOrgMemberTrends(request):
-    query = '''
-    SELECT 
-        CASE 
-            WHEN strftime('%m', date_joined) IN ('01', '02', '03', '04', '05', '06') THEN 'Spring'
-            WHEN strftime('%m', date_joined) IN ('07', '08', '09', '10', '11', '12') THEN 'Fall'
-        END as semester,
-        strftime('%Y', date_joined) as year,
-        COUNT(id) as member_count
-    FROM studentorg_orgmember
-    GROUP BY semester, year
-    ORDER BY year, semester
-    '''
-
-    with connection.cursor() as cursor:
-        cursor.execute(query)
-        rows = cursor.fetchall()
-
-    data = {
-        'labels': [f"{row[1]} {row[0]}" for row in rows],
-        'member_counts': [row[2] for row in rows]
-    }
 
+@cached_json(*charts.SOURCES)
+@replica_reads(models=charts.SOURCES)
+async def StackedBarOrgMemberTrends(request):
+    try:
+        start = _date_param(request, 'start')
+        end = _date_param(request, 'end')
+        data = await charts.amember_trends(
+            start=start, end=end, granularity=request.GET.get('granularity', 'term'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     return JsonResponse(data)
 
 
-def DoughnutProgramDistribution(request):
-    query = '''
-    SELECT c.college_name, COUNT(p.id) as program_count
-    FROM studentorg_college c
-    LEFT JOIN studentorg_program p ON c.id = p.college_id
-    GROUP BY c.college_name
-    ORDER BY program_count DESC
-    '''
-
-    with connection.cursor() as cursor:
-        cursor.execute(query)
-        rows = cursor.fetchall()
-
-    data = {
-        'labels': [row[0] for row in rows],
-        'program_counts': [row[1] for row in rows]
-    }
-
-    return JsonResponse(data)
-
-
-class OrganizationList(ListView):
+@cached_json(*charts.SOURCES)
+@replica_reads(models=charts.SOURCES)
+async def DoughnutProgramDistribution(request):
+    return JsonResponse(await charts.aprogram_distribution())
+
+
+@staff_member_required
+def RequestProfiles(request):
+    return JsonResponse({'requests': profiles.entries()})
+
+
+@login_required
+def Export(request, entity):
+    fmt = request.GET.get('format', 'csv')
+    compress = request.GET.get('gzip') in ('1', 'true')
+    if entity not in export.EXPORTS or fmt not in export.FORMATS:
+        raise Http404('Unknown export.')
+
+    query = request.GET.get('q')
+    if isinstance(request, ASGIRequest):
+        # ASGI servers need an async iterator; given a sync one Django
+        # would read the whole export into memory first.
+        content = export.aencoded(export.alines(entity, fmt, query=query), compress)
+    else:
+        content = export.encoded(export.lines(entity, fmt, query=query), compress)
+    response = StreamingHttpResponse(content, content_type=export.content_type(fmt, compress))
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export.filename(entity, fmt, compress)}"')
+    return response
+
+
+@login_required
+@replica_reads
+def Autocomplete(request, source):
+    if source not in autocomplete.SOURCES:
+        raise Http404('Unknown autocomplete source.')
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    results, more = autocomplete.options(source, request.GET.get('q', '').strip(), page)
+    return JsonResponse({
+        'results': [{'id': pk, 'text': text} for pk, text in results],
+        'more': more,
+    })
+
+
+@login_required
+def JobStatus(request, pk):
+    return JsonResponse(jobs.describe(get_object_or_404(Job, pk=pk)))
+
+
+@login_required
+def JobDetail(request, pk):
+    job = get_object_or_404(Job, pk=pk)
+    next_url = request.GET.get('next')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = None
+    return render(request, 'jobs/job.html', {'job': job, 'next': next_url})
+
+
+@login_required
+def Import(request):
+    report = None
+    form = ImportForm(request.POST or None, request.FILES or None)
+    if form.is_valid():
+        report = importer.run(form.cleaned_data['kind'], form.cleaned_data['file'].file)
+        messages.success(
+            request, f'{report.created} created, {report.updated} updated, '
+                     f'{len(report.errors)} rejected.')
+    return render(request, 'import/import.html', {'form': form, 'report': report})
+
+
+class OrganizationList(ReplicaReadMixin, FragmentCacheMixin, RelatedObjectsMixin, CursorPaginationMixin, CachedCountMixin, AsyncListMixin, ListView):
     model = Organization
     context_object_name = 'organization'
     template_name = 'organization/org_list.html'
+    ordering = ['name', 'id']
     paginate_by = 5
+    fragment_models = (Organization, College, OrgMember)
+    select_related = ('college',)
+    count_limit = 1000
+
+    def get_ordering(self):
+        # ?sort=members lists the most popular first, read off organization_popularity_idx.
+        if self.request.GET.get('sort') == 'members':
+            return ['-member_count', 'name', 'id']
+        return super().get_ordering()
 
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
         if self.request.GET.get("q") != None:
             query = self.request.GET.get('q')
-            qs = qs.filter(Q(name__icontains=query) | Q(description__icontains=query))
+            qs = search(qs, query)
         return qs
 
 
-class OrganizationCreateView(CreateView):
+class OrganizationCreateView(LoginRequiredMixin, CreateView):
     model = Organization
     form_class = OrganizationForm
     template_name = 'organization/org_add.html'
@@ -178,7 +188,7 @@ class OrganizationCreateView(CreateView):
         return super().form_valid(form)
 
 
-class OrganizationUpdateView(UpdateView):
+class OrganizationUpdateView(LoginRequiredMixin, UpdateView):
     model = Organization
     form_class = OrganizationForm
     template_name = 'organization/org_edit.html'
@@ -190,42 +200,35 @@ class OrganizationUpdateView(UpdateView):
         return super().form_valid(form)
 
 
-class OrganizationDeleteView(DeleteView):
+class OrganizationDeleteView(LoginRequiredMixin, BulkDeleteMixin, DeleteView):
     model = Organization
     template_name = 'organization/org_del.html'
     success_url = reverse_lazy('organization-list')
 
-    def form_valid(self, form):
-        messages.success(self.request, 'Successfully deleted.')
-        return super().form_valid(form)
-
 
 # OrgMember Views
 
 
-class OrgMemberList(ListView):
-    model = OrgMember
-    context_object_name = 'orgmember'
-    template_name = 'orgmember/orgmember_list.html'
-    paginate_by = 5
+class OrgMemberList(ReplicaReadMixin, FragmentCacheMixin, RelatedObjectsMixin, CursorPaginationMixin, CachedCountMixin, AsyncListMixin, ListView):
     model = OrgMember
     context_object_name = 'orgmember'
     template_name = 'orgmember/orgmember_list.html'
+    # The cursor's order, so ?cursor= pages work here; searches keep it
+    # when paginated by number.
+    ordering = ['-created_at', '-id']
     paginate_by = 5
+    fragment_models = (OrgMember, Student, Organization)
+    select_related = ('student', 'organization')
 
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
         if self.request.GET.get("q") != None:
             query = self.request.GET.get('q')
-            qs = qs.filter(
-                Q(student__firstname__icontains=query) |
-                Q(student__lastname__icontains=query) |
-                Q(organization__name__icontains=query)
-            )
+            qs = search(qs, query)
         return qs
 
 
-class OrgMemberCreateView(CreateView):
+class OrgMemberCreateView(LoginRequiredMixin, CreateView):
     model = OrgMember
     form_class = OrgMemberForm
     template_name = 'orgmember/orgmember_add.html'
@@ -237,8 +240,9 @@ class OrgMemberCreateView(CreateView):
         return super().form_valid(form)
 
 
-class OrgMemberUpdateView(UpdateView):
+class OrgMemberUpdateView(LoginRequiredMixin, UpdateView):
     model = OrgMember
+    queryset = OrgMember.objects.select_related('student', 'organization')
     form_class = OrgMemberForm
     template_name = 'orgmember/orgmember_edit.html'
     success_url = reverse_lazy('orgmember-list')
@@ -249,8 +253,9 @@ class OrgMemberUpdateView(UpdateView):
         return super().form_valid(form)
 
 
-class OrgMemberDeleteView(DeleteView):
+class OrgMemberDeleteView(LoginRequiredMixin, DeleteView):
     model = OrgMember
+    queryset = OrgMember.objects.select_related('student', 'organization')
     template_name = 'orgmember/orgmember_del.html'
     success_url = reverse_lazy('orgmember-list')
 
@@ -262,26 +267,26 @@ class OrgMemberDeleteView(DeleteView):
 # Student Views
 
 
-class StudentList(ListView):
+class StudentList(ReplicaReadMixin, FragmentCacheMixin, RelatedObjectsMixin, CursorPaginationMixin, CachedCountMixin, AsyncListMixin, ListView):
     model = Student
     context_object_name = 'student'
     template_name = 'student/student_list.html'
+    # The cursor's order, so ?cursor= pages work here; a ranked search
+    # orders by rank instead.
+    ordering = ['-created_at', '-id']
     paginate_by = 5
+    fragment_models = (Student, Program, College)
+    select_related = ('program', 'college')
 
     def get_queryset(self):
-        queryset = Student.objects.all()
+        queryset = super().get_queryset()
         query = self.request.GET.get('q')
         if query:
-            queryset = queryset.filter(
-                Q(firstname__icontains=query) |
-                Q(lastname__icontains=query) |
-                Q(middlename__icontains=query) |
-                Q(student_id__icontains=query)
-            )
+            queryset = search(queryset, query)
         return queryset
 
 
-class StudentCreateView(CreateView):
+class StudentCreateView(LoginRequiredMixin, CreateView):
     model = Student
     form_class = StudentForm
     template_name = 'student/student_add.html'
@@ -293,7 +298,7 @@ class StudentCreateView(CreateView):
         return super().form_valid(form)
 
 
-class StudentUpdateView(UpdateView):
+class StudentUpdateView(LoginRequiredMixin, UpdateView):
     model = Student
     form_class = StudentForm
     template_name = 'student/student_edit.html'
@@ -309,7 +314,7 @@ class StudentUpdateView(UpdateView):
         return super().form_valid(form)
 
 
-class StudentDeleteView(DeleteView):
+class StudentDeleteView(LoginRequiredMixin, DeleteView):
     model = Student
     template_name = 'student/student_del.html'
     success_url = reverse_lazy('student-list')
@@ -325,21 +330,23 @@ class StudentDeleteView(DeleteView):
 # College Views
 
 
-class CollegeList(ListView):
+class CollegeList(ReplicaReadMixin, FragmentCacheMixin, CursorPaginationMixin, CachedCountMixin, AsyncListMixin, ListView):
     model = College
     context_object_name = 'college'
     template_name = 'college/college_list.html'
+    ordering = ['college_name', 'id']
     paginate_by = 5
+    fragment_models = (College,)
 
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
         if self.request.GET.get("q") != None:
             query = self.request.GET.get('q')
-            qs = qs.filter(Q(college_name__icontains=query))
+            qs = search(qs, query)
         return qs
 
 
-class CollegeCreateView(CreateView):
+class CollegeCreateView(LoginRequiredMixin, CreateView):
     model = College
     form_class = CollegeForm
     template_name = 'college/college_add.html'
@@ -355,7 +362,7 @@ class CollegeCreateView(CreateView):
         return super().form_valid(form)
 
 
-class CollegeUpdateView(UpdateView):
+class CollegeUpdateView(LoginRequiredMixin, UpdateView):
     model = College
     form_class = CollegeForm
     template_name = 'college/college_edit.html'
@@ -371,33 +378,38 @@ class CollegeUpdateView(UpdateView):
         return super().form_valid(form)
 
 
-class CollegeDeleteView(DeleteView):
+class CollegeDeleteView(LoginRequiredMixin, BulkDeleteMixin, DeleteView):
     model = College
     template_name = 'college/college_del.html'
     success_url = reverse_lazy('college-list')
 
-    def form_valid(self, form):
-        messages.success(self.request, 'Successfully deleted.')
-        return super().form_valid(form)
-
 # Program Views
 
 
-class ProgramList(ListView):
+class ProgramList(ReplicaReadMixin, FragmentCacheMixin, RelatedObjectsMixin, CursorPaginationMixin, CachedCountMixin, AsyncListMixin, ListView):
     model = Program
     context_object_name = 'program'
     template_name = 'program/program_list.html'
+    ordering = ['prog_name', 'id']
     paginate_by = 5
+    fragment_models = (Program, College, Student)
+    select_related = ('college',)
+
+    def get_ordering(self):
+        # ?sort=students lists the most popular first, read off program_popularity_idx.
+        if self.request.GET.get('sort') == 'students':
+            return ['-student_count', 'prog_name', 'id']
+        return super().get_ordering()
 
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
         if self.request.GET.get("q") != None:
             query = self.request.GET.get('q')
-            qs = qs.filter(Q(prog_name__icontains=query))
+            qs = search(qs, query)
         return qs
 
 
-class ProgramCreateView(CreateView):
+class ProgramCreateView(LoginRequiredMixin, CreateView):
     model = Program
     form_class = ProgramForm
     template_name = 'program/program_add.html'
@@ -409,7 +421,7 @@ class ProgramCreateView(CreateView):
         return super().form_valid(form)
 
 
-class ProgramUpdateView(UpdateView):
+class ProgramUpdateView(LoginRequiredMixin, UpdateView):
     model = Program
     form_class = ProgramForm
     template_name = 'program/program_edit.html'
@@ -421,11 +433,7 @@ class ProgramUpdateView(UpdateView):
         return super().form_valid(form)
 
 
-class ProgramDeleteView(DeleteView):
+class ProgramDeleteView(LoginRequiredMixin, BulkDeleteMixin, DeleteView):
     model = Program
     template_name = 'program/program_del.html'
     success_url = reverse_lazy('program-list')
-
-    def form_valid(self, form):
-        messages.success(self.request, 'Successfully deleted.')
-        return super().form_valid(form)
@@ -0,0 +1,55 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """Select for a ModelChoiceField that renders only the selected option.
+
+    The other options are fetched as the user types from the autocomplete
+    endpoint for ``source`` (see studentorg.autocomplete), so the page does
+    not grow with the related table.
+    """
+
+    class Media:
+        js = ['js/autocomplete.js']
+
+    def __init__(self, source, attrs=None):
+        super().__init__(attrs)
+        self.source = source
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse('autocomplete', args=[self.source])
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        key = field.to_field_name or 'pk'
+        selected = self._valid(key, value)
+        options = []
+        if not self.is_required or not selected:
+            options.append(self.create_option(name, '', field.empty_label or '',
+                                              not selected, 0))
+        if selected:
+            for index, obj in enumerate(self.choices.queryset.filter(**{f'{key}__in': selected}),
+                                        start=len(options)):
+                options.append(self.create_option(
+                    name, field.prepare_value(obj), field.label_from_instance(obj), True, index))
+        return [(None, options, 0)]
+
+    def _valid(self, key, value):
+        # A bound form re-renders with whatever was posted; values that are
+        # not keys of the related model select nothing and are left for the
+        # field to reject with "Select a valid choice".
+        opts = self.choices.queryset.model._meta
+        model_field = opts.pk if key == 'pk' else opts.get_field(key)
+        valid = []
+        for v in value:
+            if v in ('', None):
+                continue
+            try:
+                valid.append(model_field.to_python(v))
+            except ValidationError:
+                continue
+        return valid